@@ -4,20 +4,50 @@ author: you
 """
 
 # ─────────────────────────  Imports
+import threading
 import pandas as pd, numpy as np, plotly.express as px, plotly.graph_objects as go
-from dash import Dash, dcc, html, Input, Output, State
+from dash import Dash, dcc, html, Input, Output, State, Patch, no_update
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 from pathlib import Path
+from datastore import SCHEMA
+from fleet import Fleet
+from kpis import range_delta, range_kpis, store_kpis, with_history, history_delta
+from duty import WINDOWS
+from histogram import VDEV_EDGES
+from downsample import downsample, lttb
+from push import VersionBroadcaster
+from figcache import FigureCache
+from overview import FleetSummary
+import watcher
 
 # ─────────────────────────  CONFIG
-CSV_PATH          = Path(__file__).with_name("fridge_enriched.csv")
+CSV_PATH          = Path(__file__).with_name("fridge_enriched.csv")   # local working copy (git-ignored)
+if not CSV_PATH.exists():
+    CSV_PATH      = CSV_PATH.with_name("data.csv")                  # bundled export, read only
+FLEET_ROOT        = None        # dir of per-device partitions (<device>.csv / <device>.<fmt>/); None → CSV_PATH only
+FLEET_OPEN        = 8           # devices held in memory at once (least recently viewed closes)
 BOOTSTRAP_THEME   = dbc.themes.CYBORG           # dark, accessible
 FONT_URL          = "https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;600&display=swap"
 FA_URL            = "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.0/css/all.min.css"
 LottieCDN         = "https://unpkg.com/@lottiefiles/lottie-player@latest/dist/lottie-player.js"
 ACCENT            = "#00e1ff"
 
-REFRESH_MS        = 10_000      # auto-refresh interval
+REFRESH_MS        = 10_000      # auto-refresh interval (polling fallback)
+LIVE_PUSH         = True        # SSE `/_events` announces new rows instead of polling
+DATA_FORMAT       = "csv"       # "csv" | "parquet" | "feather" | "mmap" | "sqlite" | "duckdb" (one worker only) – see fleet.open_store()
+COMPACT_DTYPES    = True        # float32 / uint8 / categorical columns (datastore.SCHEMA)
+GORILLA_COLUMNS   = False       # CSV only: keep Voltage_V / Frequency_Hz / Current_A / PF compressed (fleet.Device.raw)
+PLOT_POINTS       = 800         # ≈ plot width in px – rollup tier is picked to match
+POINT_BUDGET      = 2_000       # max points per trace sent to the browser
+PATCH_SLACK       = 500         # live-appended points allowed before a full redraw
+INGEST_S          = 1.0         # background ingest checks the source this often
+WATCH_FILES       = True        # Linux inotify wakes ingest on write (else poll every INGEST_S)
+WATCH_FALLBACK_S  = 30.0        # safety-net poll while the watcher is active
+SHEETS_JSON       = Path(__file__).parents[1] / "data" / "energy-data.json"  # Sheets export
+FIG_CACHE_ENTRIES = 256         # serialised figures shared by all sessions (LRU)
+FIG_CACHE_MB      = 64
+FLEET_REFRESH_MS  = 5_000       # fleet table re-check while its tab is open
 
 # ─────────────────────────  App & assets
 external_stylesheets=[FONT_URL, FA_URL, BOOTSTRAP_THEME]
@@ -30,14 +60,50 @@ app = Dash(__name__,
 
 server = app.server   # for production deployment
 
-def load_data():
-    df = pd.read_csv(CSV_PATH, parse_dates=["Time"])
-    if pd.api.types.is_datetime64tz_dtype(df["Time"]):
-        df["Time"] = df["Time"].dt.tz_localize(None)
-    df["unix"] = (df["Time"] - pd.Timestamp("1970-01-01")) // pd.Timedelta("1s")
-    return df
+# Every meter is a `fleet.Device` (source + indexes + ingest thread), opened
+# the first time a browser selects it. Callbacks read `dev.ingest.frame` and
+# the device's indexes inside `dev.ingest.reading()` and never block on disk.
+# A write to a partition (or a fresh Sheets export) wakes ingest directly, so a
+# new row reaches the browser in tens of ms and nothing polls while idle.
+WATCHING = WATCH_FILES and watcher.available()
+events = VersionBroadcaster()   # wakes every /_events stream on a new version
+fleet  = Fleet(FLEET_ROOT or CSV_PATH, DATA_FORMAT, SCHEMA if COMPACT_DTYPES else None,
+               period_s=WATCH_FALLBACK_S if WATCHING else INGEST_S,
+               max_open=FLEET_OPEN, on_publish=events.publish, compress=GORILLA_COLUMNS)
+DEFAULT_DEVICE = fleet.devices()[0]
+default = fleet.get(DEFAULT_DEVICE)     # first snapshot synchronously
 
-df = load_data()      # initial read
+watch = None
+if WATCHING:
+    # the fleet root sees new CSV rows; binary partitions write inside <device>.<fmt>/,
+    # so every device opened from now on adds its own directory
+    watch = watcher.InotifyWatcher([FLEET_ROOT or default.watch_path, default.watch_path,
+                                    SHEETS_JSON], fleet.wake).start()
+    fleet.on_open = lambda dev: watch.add(dev.watch_path)
+
+@server.before_request
+def ensure_ingest():
+    fleet.start()               # no-op unless a fork (gunicorn --preload) lost the threads
+    if watch:
+        watch.start()
+
+# Figures keyed on (device, view, data version, row range, budget) – the same
+# default view in many browsers is built once per version
+figs = FigureCache(FIG_CACHE_ENTRIES, FIG_CACHE_MB * 2**20)
+
+# One summary row per partition, read from file tails by a process pool;
+# warmed in the background – until that finishes the Fleet tab shows an empty
+# table and fills in on the next `fleet-refresh` tick
+overview = FleetSummary(fleet)
+threading.Thread(target=overview.table, daemon=True).start()
+
+@server.route("/_stats")
+def data_stats():
+    return {"fleet": fleet.stats(), "figures": figs.stats(), "overview": overview.stats()}
+
+@server.route("/_events")
+def data_events():
+    return events.stream()
 
 # ─────────────────────────  Helper: KPI card
 def kpi(id_icon, label, value, unit=""):
@@ -57,6 +123,9 @@ app.layout = dbc.Container(fluid=True, children=[
         dbc.Col(html.H2("⚡ Fridge IoT Dashboard", className="fw-semibold"),
                 width="auto"),
         dbc.Col(html.Div(), className="flex-grow-1"),
+        dbc.Col(dcc.Dropdown(id="device", options=fleet.devices(), value=DEFAULT_DEVICE,
+                             clearable=False, style={"minWidth":"12rem","color":"#111"}),
+                width="auto"),
         dbc.Col(dbc.Switch(id="live-toggle", value=True,
                            label="Live", label_checked="Live",
                            className="mt-2"), width="auto"),
@@ -69,8 +138,8 @@ app.layout = dbc.Container(fluid=True, children=[
     dbc.Row([
         dcc.RangeSlider(
             id="time-slider",
-            min=df["unix"].min(), max=df["unix"].max(),
-            value=[df["unix"].min(), df["unix"].max()],
+            min=default.snapshot["unix"].min(), max=default.snapshot["unix"].max(),
+            value=[default.snapshot["unix"].min(), default.snapshot["unix"].max()],
             step=60, allowCross=False,
             tooltip={"placement":"bottom", "always_visible":False},
         ),
@@ -81,9 +150,32 @@ app.layout = dbc.Container(fluid=True, children=[
         dbc.Tab(label="Power & Energy",  tab_id="tab-power"),
         dbc.Tab(label="Quality",         tab_id="tab-quality"),
         dbc.Tab(label="Cost",            tab_id="tab-cost"),
+        dbc.Tab(label="Cycles",          tab_id="tab-cycles"),
+        dbc.Tab(label="Fleet",           tab_id="tab-fleet"),
     ], id="tabs", active_tab="tab-power", className="mb-3"),
 
-    html.Div(id="tab-content"),     # chart placeholder
+    # One pane per tab; only the visible pane's callback does any work
+    html.Div(id="pane-power", children=dbc.Row([
+        dbc.Col(dcc.Graph(id="power-graph",  config={"displayModeBar":False}), md=6),
+        dbc.Col(dcc.Graph(id="energy-graph", config={"displayModeBar":False}), md=6),
+        dbc.Col(dcc.Graph(id="duty-graph",   config={"displayModeBar":False}), md=12),
+    ])),
+    html.Div(id="pane-quality", style={"display":"none"}, children=dbc.Row([
+        dbc.Col(dcc.Graph(id="pf-gauge",  config={"displayModeBar":False}), md=6),
+        dbc.Col(dcc.Graph(id="vdev-hist", config={"displayModeBar":False}), md=6),
+    ])),
+    html.Div(id="pane-cost", style={"display":"none"}, children=dbc.Row([
+        dbc.Col(dcc.Graph(id="cost-bullet", config={"displayModeBar":False}), md=4),
+        dbc.Col(dcc.Graph(id="hour-pie",    config={"displayModeBar":False}), md=8),
+    ])),
+    html.Div(id="pane-cycles", style={"display":"none"}, children=dbc.Row([
+        dbc.Col(dcc.Graph(id="cycle-hist",   config={"displayModeBar":False}), md=6),
+        dbc.Col(dcc.Graph(id="cycle-energy", config={"displayModeBar":False}), md=6),
+    ])),
+    html.Div(id="pane-fleet", style={"display":"none"}, children=[
+        html.Div(id="fleet-table"),
+        dcc.Interval(id="fleet-refresh", interval=FLEET_REFRESH_MS, disabled=True),
+    ]),
 
     # Device photo placeholder + animation
     dbc.Row([
@@ -106,102 +198,426 @@ app.layout = dbc.Container(fluid=True, children=[
         ], md=6),
     ], className="gy-4"),
 
-    # Hidden auto-refresh timer
-    dcc.Interval(id="refresh", interval=REFRESH_MS, n_intervals=0)
+    # Hidden auto-refresh timer (off when pushed) + last data version drawn
+    dcc.Interval(id="refresh", interval=REFRESH_MS, n_intervals=0, disabled=LIVE_PUSH),
+    dcc.Store(id="push-version"),   # written by the /_events EventSource
+    dcc.Store(id="data-version"),
+    dcc.Store(id="power-drawn"),    # what the power graphs show → live appends
 ], style={"fontFamily":"Poppins, sans-serif"})
 
 # ─────────────────────────  Callbacks
 
-def slice_by_slider(data, slider):
-    t0, t1 = [pd.to_datetime(v, unit="s") for v in slider]
-    return data[(data["Time"]>=t0) & (data["Time"]<=t1)]
+def slider_bounds(data, slider):
+    # `unix` is sorted on ingest → two binary searches, no mask
+    unix = data["unix"].to_numpy()
+    return (int(np.searchsorted(unix, slider[0], side="left")),
+            int(np.searchsorted(unix, slider[1], side="right")))
+
+def range_data(dev, slider_range, live_on):
+    """Device's current frame (or its Live-off snapshot) + slider bounds; call inside `dev.ingest.reading()`."""
+    data = dev.ingest.frame if live_on else dev.snapshot
+    return (data, *slider_bounds(data, slider_range))
+
+def unix_bounds(data, i0, i1):
+    """Rows [i0, i1) as the inclusive `unix` range an SQL store filters on."""
+    unix = data["unix"].to_numpy()
+    return (int(unix[i0]), int(unix[i1 - 1])) if i1 > i0 else (1, 0)
+
+def history_before(dev, data, slider_range):
+    """`retention.History` buckets are needed when the slider starts before the raw rows."""
+    raw_t0 = int(data["unix"].iat[0]) if len(data) else None
+    return raw_t0 if raw_t0 is not None and slider_range[0] < raw_t0 else None
+
+def fig_key(dev, view, live_on, *parts):
+    """Figure-cache key for the data `range_data` returned; call inside `dev.ingest.reading()`."""
+    return (dev.name, view, dev.ingest.version if live_on else dev.snapshot_tag, *parts)
+
+# Each output group has its own callback. They all hang off `data-version`,
+# which `poll_version` only bumps when ingestion actually produced new rows,
+# and the chart callbacks bail out unless their tab is the visible one.
+@app.callback(
+    Output("data-version","data"),
+    Output("time-slider","min"),
+    Output("time-slider","max"),
+    Output("time-slider","value"),
+    Input("refresh","n_intervals"),
+    Input("push-version","data"),
+    Input("live-toggle","value"),
+    Input("device","value"),
+    State("data-version","data"),
+    State("time-slider","max"),
+    State("time-slider","value"))
+def poll_version(n, pushed, live_on, device, seen, smax, slider_range):
+    dev = fleet.get(device)
+    v = f"{device}:{dev.ingest.version if live_on else dev.snapshot_tag}"
+    if v == seen:
+        raise PreventUpdate
+    data = dev.ingest.frame if live_on else dev.snapshot
+    oldest, newest = int(data["unix"].iat[0]), int(data["unix"].iat[-1])
+    oldest = dev.history.oldest(oldest) or oldest     # folded buckets come first
+    if seen is not None and seen.rpartition(":")[0] != device:
+        slider_range = [oldest, newest]         # other device → its whole history
+    elif slider_range[1] >= smax or slider_range[1] > newest:
+        # a slider pinned to the right edge follows the live data
+        slider_range = [min(slider_range[0], newest), newest]
+    else:
+        slider_range = no_update
+    return v, oldest, newest, slider_range
+
+@app.callback(
+    Output("device","options"),
+    Input("push-version","data"),
+    Input("refresh","n_intervals"),
+    State("device","options"))
+def list_devices(pushed, n, shown):
+    names = fleet.devices()             # partitions added since page load show up
+    if names == shown:
+        raise PreventUpdate
+    return names
 
 @app.callback(
     Output("kpi-row","children"),
-    Output("tab-content","children"),
     Input("time-slider","value"),
-    Input("tabs","active_tab"),
-    Input("refresh","n_intervals"),
-    Input("live-toggle","value"))
-def update_dashboard(slider_range, tab, n, live_on):
-    data = load_data() if live_on else df                # refresh if live
-    dff  = slice_by_slider(data, slider_range)
-
-    # === KPIs
-    total_kwh  = dff["Energy_kWh"].iloc[-1] - dff["Energy_kWh"].iloc[0]
-    cost_bd    = dff["Cost_cum_BDT"].iloc[-1] - dff["Cost_cum_BDT"].iloc[0]
-    avg_volt   = dff["Voltage_V"].mean()
-    duty_now   = dff["DutyCycle_%_24H"].iloc[-1]
-
-    kpis = [
+    Input("data-version","data"),
+    State("live-toggle","value"),
+    State("device","value"))
+def update_kpis(slider_range, version, live_on, device):
+    if version is None:
+        raise PreventUpdate
+    dev = fleet.get(device)
+    with dev.ingest.reading():
+        data, i0, i1 = range_data(dev, slider_range, live_on)
+        if dev.sql is not None:         # aggregated by the database
+            k = store_kpis(dev.sql, dev.duty, *unix_bounds(data, i0, i1), i1)
+        else:
+            k = range_kpis(data, dev.kpi_sums, dev.duty, i0, i1)
+        raw_t0 = history_before(dev, data, slider_range)
+        if raw_t0 and (hist := dev.history.kpis(*slider_range, raw_t0)):
+            k = with_history(k, hist, data, i0, i1)
+    total_kwh  = k["energy_kwh"]
+    cost_bd    = k["cost_bdt"]
+    avg_volt   = k["avg_volt"]
+    duty_now   = k["duty_now"]
+
+    return [
         kpi("bolt-lightning","Energy", f"{total_kwh:,.2f}"," kWh"),
         kpi("coins","Cost", f"{cost_bd:,.0f}"," BDT"),
         kpi("gauge-high","Avg V", f"{avg_volt:,.0f}"," V"),
         kpi("snowflake","Duty 24h", f"{duty_now:,.0f}"," %"),
     ]
 
-    # === Charts per tab
-    if tab=="tab-power":
-        fig = px.area(
-            dff, x="Time", y="ActivePower_kW",
-            title="Active Power – spline",
-            line_shape="spline", color_discrete_sequence=[ACCENT]
-        )
-        fig.update_traces(fill="tozeroy", fillcolor="rgba(0,225,255,0.3)")
-        fig2 = px.line(
-            dff, x="Time",
-            y=(dff["Energy_kWh"]-dff["Energy_kWh"].iloc[0]),
-            line_shape="hv", labels={"y":"kWh"},
-            title="Accumulated Energy (interval)")
-        for g in (fig, fig2):
-            g.update_layout(template="plotly_dark", height=350, title_x=0.5)
-        content = dbc.Row([
-            dbc.Col(dcc.Graph(figure=fig, config={"displayModeBar":False}), md=6),
-            dbc.Col(dcc.Graph(figure=fig2,config={"displayModeBar":False}), md=6),
-        ])
-
-    elif tab=="tab-quality":
-        # PF gauge
-        gauge = go.Figure(go.Indicator(
-            mode="gauge+number+delta", value=dff["PowerFactor"].mean(),
-            domain={"x":[0,1], "y":[0,1]},
-            title={"text":"Mean PF"},
-            gauge={
-                "axis":{"range":[0,1]},
-                "bar":{"color":ACCENT},
-                "steps":[{"range":[0,.7],"color":"#842"}, {"range":[.7,.9],"color":"#b8860b"},
-                         {"range":[.9,1],"color":"#246"}],
+def plot_xy(frame, col):
+    """x / y as JSON lists (not typed arrays) so a `Patch` can extend them."""
+    return (frame["Time"].dt.strftime("%Y-%m-%d %H:%M:%S").tolist(),
+            frame[col].to_numpy(np.float64).round(5).tolist())
+
+def live_append(name, data, i0, i1, drawn):
+    """
+    Patches that append rows of device `name` newer than what this session last
+    drew, or None when a full redraw is needed (other device, other range,
+    other resolution, reload, or too many appended points since the last
+    downsampling pass).
+    """
+    unix = data["unix"].to_numpy()
+    if (not drawn or drawn.get("device") != name or drawn["tier"] is not None or i1 <= i0
+            or drawn["first"] != unix[i0] or drawn["last"] > unix[i1-1]):
+        return None
+    j = int(np.searchsorted(unix, drawn["last"], side="right"))
+    if unix[j-1] != drawn["last"] or drawn["appended"] + (i1 - j) > PATCH_SLACK:
+        return None
+    if j == i1:
+        raise PreventUpdate                 # already on screen
+    new = data.iloc[j:i1]
+    patches = []
+    for frame, col in ((new, "ActivePower_kW"),
+                       (new.assign(kWh=new["Energy_kWh"]-data["Energy_kWh"].iat[i0]), "kWh")):
+        x, y = plot_xy(frame, col)
+        p = Patch()
+        p["data"][0]["x"].extend(x)
+        p["data"][0]["y"].extend(y)
+        patches.append(p)
+    drawn = {**drawn, "last": int(unix[i1-1]), "appended": drawn["appended"] + len(new)}
+    return (*patches, drawn)
+
+@app.callback(
+    Output("power-graph","figure"),
+    Output("energy-graph","figure"),
+    Output("power-drawn","data"),
+    Input("time-slider","value"),
+    Input("tabs","active_tab"),
+    Input("data-version","data"),
+    State("live-toggle","value"),
+    State("device","value"),
+    State("power-drawn","data"))
+def update_power(slider_range, tab, version, live_on, device, drawn):
+    if tab != "tab-power" or version is None:
+        raise PreventUpdate                 # hidden tab – compute nothing
+    dev = fleet.get(device)
+    with dev.ingest.reading():
+        data, i0, i1 = range_data(dev, slider_range, live_on)
+        raw_t0 = history_before(dev, data, slider_range)
+        if i1 <= i0 and raw_t0 is None:
+            raise PreventUpdate
+        dff  = data.iloc[i0:i1]
+        tier = dev.rollups.pick(*slider_range, PLOT_POINTS)
+        if tier is None and raw_t0 is None:
+            patched = live_append(dev.name, data, i0, i1, drawn)    # only the new minutes
+            if patched:
+                return patched
+        key = fig_key(dev, "power", live_on, i0, i1, tier and tier.name, POINT_BUDGET,
+                      raw_t0 and dev.history.version)
+        if hit := figs.get(key):
+            return hit
+        if i1 <= i0:
+            pts = dff                       # the whole range is history
+            res = ""
+        elif tier is None:
+            pts = dff.assign(kWh=dff["Energy_kWh"]-dff["Energy_kWh"].iloc[0])
+            res = ""                        # raw minutes already ≈ one per pixel
+        else:
+            pts = tier.frame(*slider_range)
+            pts["kWh"] = pts["dE_kWh"].cumsum() - pts["dE_kWh"].iloc[0]
+            res = f" ({tier.name} mean)"
+        if raw_t0 is not None:              # before the raw rows → folded hourly / daily buckets
+            cols = ["Time", "unix", "ActivePower_kW", "dE_kWh"]
+            pts  = pd.concat([dev.history.frame(*slider_range, raw_t0)[cols], pts[cols]],
+                             ignore_index=True)
+            if pts.empty:
+                raise PreventUpdate
+            pts["kWh"] = pts["dE_kWh"].cumsum() - pts["dE_kWh"].iloc[0]
+            res += " + archived buckets"
+    p_pts = downsample(pts, "unix", "ActivePower_kW", POINT_BUDGET, "minmax")
+    e_pts = downsample(pts, "unix", "kWh", POINT_BUDGET, "lttb")
+    fig = px.area(
+        p_pts, x="Time", y="ActivePower_kW",
+        title="Active Power – spline" + res,
+        line_shape="spline", color_discrete_sequence=[ACCENT]
+    )
+    fig.update_traces(fill="tozeroy", fillcolor="rgba(0,225,255,0.3)")
+    fig2 = px.line(
+        e_pts, x="Time", y="kWh",
+        line_shape="hv",
+        title="Accumulated Energy (interval)")
+    for g, frame, col in ((fig, p_pts, "ActivePower_kW"), (fig2, e_pts, "kWh")):
+        x, y = plot_xy(frame, col)
+        g.update_traces(x=x, y=y)
+        g.update_layout(template="plotly_dark", height=350, title_x=0.5)
+    if raw_t0 is not None:
+        drawn = {"device": dev.name, "tier": "history"}     # never patched – redrawn as a whole
+    else:
+        drawn = {"device": dev.name, "tier": None if tier is None else tier.name, "appended": 0,
+                 "first": int(data["unix"].iat[i0]), "last": int(data["unix"].iat[i1-1])}
+    return figs.put(key, (fig, fig2, drawn))
+
+@app.callback(
+    Output("duty-graph","figure"),
+    Input("time-slider","value"),
+    Input("tabs","active_tab"),
+    Input("data-version","data"),
+    State("live-toggle","value"),
+    State("device","value"))
+def update_duty(slider_range, tab, version, live_on, device):
+    if tab != "tab-power" or version is None:
+        raise PreventUpdate
+    dev = fleet.get(device)
+    fig = go.Figure()
+    with dev.ingest.reading():
+        data, i0, i1 = range_data(dev, slider_range, live_on)
+        if i1 <= i0:
+            raise PreventUpdate
+        key = fig_key(dev, "duty", live_on, i0, i1, POINT_BUDGET)
+        if hit := figs.get(key):
+            return hit[0]
+        unix, time = data["unix"].to_numpy()[i0:i1], data["Time"].iloc[i0:i1]
+        for w in WINDOWS:               # O(1) per row on ingest, a slice here
+            y   = dev.duty.series(w, i0, i1)
+            idx = lttb(unix, y, POINT_BUDGET)
+            fig.add_trace(go.Scattergl(x=time.iloc[idx], y=y[idx], mode="lines", name=w))
+    fig.update_layout(template="plotly_dark", height=300, title_x=0.5,
+                      title="Compressor duty cycle (%)", yaxis_range=[0, 100])
+    return figs.put(key, (fig,))[0]
+
+@app.callback(
+    Output("pf-gauge","figure"),
+    Output("vdev-hist","figure"),
+    Input("time-slider","value"),
+    Input("tabs","active_tab"),
+    Input("data-version","data"),
+    State("live-toggle","value"),
+    State("device","value"))
+def update_quality(slider_range, tab, version, live_on, device):
+    if tab != "tab-quality" or version is None:
+        raise PreventUpdate
+    dev = fleet.get(device)
+    with dev.ingest.reading():
+        data, i0, i1 = range_data(dev, slider_range, live_on)
+        key = fig_key(dev, "quality", live_on, i0, i1)
+        if hit := figs.get(key):
+            return hit
+        if dev.sql is not None:
+            t0, t1  = unix_bounds(data, i0, i1)
+            mean_pf = dev.sql.mean("PowerFactor", t0, t1)
+            counts  = dev.sql.counts("Voltage_Deviation_%", VDEV_EDGES, t0, t1)
+            outside = dev.sql.outside("Voltage_Deviation_%", VDEV_EDGES, t0, t1)
+        else:
+            mean_pf = dev.kpi_sums.mean("PowerFactor", i0, i1)
+            counts  = dev.vdev.counts(i0, i1)
+            outside = dev.vdev.outside(i0, i1)
+    # PF gauge
+    gauge = go.Figure(go.Indicator(
+        mode="gauge+number+delta", value=mean_pf,
+        domain={"x":[0,1], "y":[0,1]},
+        title={"text":"Mean PF"},
+        gauge={
+            "axis":{"range":[0,1]},
+            "bar":{"color":ACCENT},
+            "steps":[{"range":[0,.7],"color":"#842"}, {"range":[.7,.9],"color":"#b8860b"},
+                     {"range":[.9,1],"color":"#246"}],
+        }
+    )).update_layout(template="plotly_dark", height=350)
+    # Voltage histogram – binned on ingest, 40 bars over ±10 %
+    hist = go.Figure(go.Bar(x=dev.vdev.centers, y=counts, width=np.diff(VDEV_EDGES),
+                            marker_color=ACCENT))
+    title = "Voltage deviation histogram (%)"
+    if outside:
+        title += f" – {outside} beyond ±{VDEV_EDGES[-1]:.0f} %"
+    hist.update_layout(template="plotly_dark", height=350, title_x=0.5,
+                       title=title, bargap=0)
+    return figs.put(key, (gauge, hist))
+
+@app.callback(
+    Output("cost-bullet","figure"),
+    Output("hour-pie","figure"),
+    Input("time-slider","value"),
+    Input("tabs","active_tab"),
+    Input("data-version","data"),
+    State("live-toggle","value"),
+    State("device","value"))
+def update_cost(slider_range, tab, version, live_on, device):
+    if tab != "tab-cost" or version is None:
+        raise PreventUpdate
+    dev = fleet.get(device)
+    with dev.ingest.reading():
+        data, i0, i1 = range_data(dev, slider_range, live_on)
+        raw_t0 = history_before(dev, data, slider_range)
+        key = fig_key(dev, "cost", live_on, i0, i1, raw_t0 and dev.history.version)
+        if hit := figs.get(key):
+            return hit
+        if dev.sql is not None:
+            t0, t1  = unix_bounds(data, i0, i1)
+            cost_bd = dev.sql.delta("Cost_cum_BDT", t0, t1)
+            kwh     = dev.sql.by_hour("dE_kWh", t0, t1)
+            bdt     = dev.sql.by_hour("Cost_step_BDT", t0, t1)
+        else:
+            cost_bd = range_delta(data, "Cost_cum_BDT", i0, i1)
+            kwh     = dev.hourly.by_hour(data, "dE_kWh", i0, i1)
+            bdt     = dev.hourly.by_hour(data, "Cost_step_BDT", i0, i1)
+        if raw_t0 and (hist := dev.history.kpis(*slider_range, raw_t0)):
+            cost_bd = history_delta(hist, data, "Cost_cum_BDT", i0, i1)   # pie: raw rows only
+    # Cost bullet & pie
+    bullet = go.Figure(go.Indicator(
+        mode="number+gauge", value=cost_bd,
+        gauge={"shape":"bullet","axis":{"range":[0,max(cost_bd*1.2,50)]},
+               "bar":{"color":ACCENT}},
+        title={"text":"Cost in range (BDT)"}
+    )).update_layout(template="plotly_dark", height=200)
+    # Pie by day-hour energy (day × hour matrix + exact partial days)
+    pie = px.pie(names=np.arange(24), values=kwh, hole=0.35,
+                 title="Energy share by hour")
+    pie.update_traces(customdata=bdt, sort=False,
+                      hovertemplate="hour %{label}<br>%{value:.3f} kWh"
+                                    "<br>%{customdata:.2f} BDT<extra></extra>")
+    pie.update_layout(template="plotly_dark", height=400, title_x=0.5)
+    return figs.put(key, (bullet, pie))
+
+@app.callback(
+    Output("cycle-hist","figure"),
+    Output("cycle-energy","figure"),
+    Input("time-slider","value"),
+    Input("tabs","active_tab"),
+    Input("data-version","data"),
+    State("live-toggle","value"),
+    State("device","value"))
+def update_cycles(slider_range, tab, version, live_on, device):
+    if tab != "tab-cycles" or version is None:
+        raise PreventUpdate
+    dev = fleet.get(device)
+    with dev.ingest.reading():
+        key = fig_key(dev, "cycles", live_on, *slider_range)
+        if hit := figs.get(key):
+            return hit
+        # binary search over cycle starts; Live off → the table as of the snapshot
+        cyc = dev.cycles.table(*slider_range, mark=None if live_on else dev.snapshot_cycles)
+    done = cyc[~cyc["open"]]
+    # Cycle-length distributions
+    hist = go.Figure([
+        go.Histogram(x=done["on_min"],  name="on",  marker_color=ACCENT, opacity=0.75),
+        go.Histogram(x=done["off_min"], name="off", marker_color="#b8860b", opacity=0.75),
+    ]).update_layout(template="plotly_dark", height=350, title_x=0.5, barmode="overlay",
+                     title=f"Cycle lengths (min) – {len(done)} cycles",
+                     xaxis_title="minutes")
+    # Energy per cycle
+    energy = px.scatter(cyc, x="Time", y="kWh", color="peak_A",
+                        hover_data=["Cycle_ID", "on_min", "off_min"],
+                        title="Energy per cycle (kWh)")
+    energy.update_layout(template="plotly_dark", height=350, title_x=0.5)
+    return figs.put(key, (hist, energy))
+
+FLEET_HEADERS = {"device":"Device", "energy_kwh":"Energy 24 h (kWh)",
+                 "cost_bdt":"Cost 24 h (BDT)", "mean_pf":"Mean PF",
+                 "duty_24h":"Duty 24 h (%)", "last_seen":"Last seen"}
+
+@app.callback(
+    Output("fleet-table","children"),
+    Input("tabs","active_tab"),
+    Input("fleet-refresh","n_intervals"))
+def update_fleet(tab, _):
+    if tab != "tab-fleet":
+        raise PreventUpdate
+    table = overview.table()            # untouched partitions are not re-read
+    key = ("fleet", overview.generation)
+    if hit := figs.get(key):
+        return hit[0]
+    shown = (table.sort_values("energy_kwh", ascending=False)
+                  .round({"energy_kwh":3, "cost_bdt":2, "mean_pf":3, "duty_24h":1})
+                  .rename(columns=FLEET_HEADERS))
+    body = dbc.Table.from_dataframe(shown, striped=True, hover=True, size="sm",
+                                    color="dark", className="mb-4")
+    return figs.put(key, (body,))[0]
+
+# Live push: one EventSource per page feeds `push-version`, which wakes poll_version
+if LIVE_PUSH:
+    app.clientside_callback(
+        """
+        function(_) {
+            if (!window.fridgeEvents) {
+                window.fridgeEvents = new EventSource("/_events");
+                window.fridgeEvents.onmessage = e =>
+                    window.dash_clientside.set_props("push-version", {data: e.data});
             }
-        )).update_layout(template="plotly_dark", height=350)
-        # Voltage histogram
-        hist = px.histogram(dff, x="Voltage_Deviation_%", nbins=40,
-                            color_discrete_sequence=[ACCENT],
-                            title="Voltage deviation histogram (%)")
-        hist.update_layout(template="plotly_dark", height=350, title_x=0.5)
-        content = dbc.Row([
-            dbc.Col(dcc.Graph(figure=gauge, config={"displayModeBar":False}), md=6),
-            dbc.Col(dcc.Graph(figure=hist,  config={"displayModeBar":False}), md=6),
-        ])
-
-    else:  # tab-cost
-        # Cost bullet & pie
-        bullet = go.Figure(go.Indicator(
-            mode="number+gauge", value=cost_bd,
-            gauge={"shape":"bullet","axis":{"range":[0,max(cost_bd*1.2,50)]},
-                   "bar":{"color":ACCENT}},
-            title={"text":"Cost in range (BDT)"}
-        )).update_layout(template="plotly_dark", height=200)
-        # Pie by day-hour energy
-        dff["hour"] = dff["Time"].dt.hour
-        pie = px.pie(dff.groupby("hour")["dE_kWh"].sum().reset_index(),
-                     names="hour", values="dE_kWh", hole=0.35,
-                     title="Energy share by hour")
-        pie.update_layout(template="plotly_dark", height=400, title_x=0.5)
-        content = dbc.Row([
-            dbc.Col(dcc.Graph(figure=bullet, config={"displayModeBar":False}), md=4),
-            dbc.Col(dcc.Graph(figure=pie,    config={"displayModeBar":False}), md=8),
-        ])
-    return kpis, content
+            return window.dash_clientside.no_update;
+        }
+        """,
+        Output("push-version","data"),
+        Input("refresh","disabled"),    # static → fires once on page load
+    )
+
+# Tab switching is pure show/hide – no server round-trip
+app.clientside_callback(
+    """
+    function(tab) {
+        return ["tab-power", "tab-quality", "tab-cost", "tab-cycles", "tab-fleet"].map(
+            t => ({display: t === tab ? "block" : "none"})).concat([tab !== "tab-fleet"]);
+    }
+    """,
+    Output("pane-power","style"),
+    Output("pane-quality","style"),
+    Output("pane-cost","style"),
+    Output("pane-cycles","style"),
+    Output("pane-fleet","style"),
+    Output("fleet-refresh","disabled"),     # poll the fleet only while it is shown
+    Input("tabs","active_tab"),
+)
 
 # ─────────────────────────  Custom CSS (inline for brevity)
 app.clientside_callback(
@@ -0,0 +1,163 @@
+"""
+Fridge IoT – micro-benchmarks for the data layer
+
+    python bench.py load        # CSV vs columnar vs mmap load time on 1/30/365-day datasets
+    python bench.py dtypes      # memory footprint with and without the compact schema
+    python bench.py enrich      # full vs incremental enrichment throughput up to 10M rows
+    python bench.py fleet       # fleet overview over 500 devices × 30 days (≈ 6.6 GB of CSV)
+    python bench.py sql         # range queries: in-memory indexes vs SQLite (and DuckDB)
+    python bench.py gorilla     # compressed telemetry columns: size and range decode time
+"""
+
+# ─────────────────────────  Imports
+import copy, shutil, sys, tempfile, time
+import numpy as np
+from pathlib import Path
+from datastore import TailReader, SCHEMA, apply_schema, finish_frame, footprint
+from columnar import ColumnarStore, TAB_COLUMNS, convert
+from mmapstore import MmapStore
+from enrich import Enricher, enrich
+from fleet import Fleet
+from kpis import PrefixSums, range_delta
+from histogram import BinnedCounts, VDEV_EDGES
+from hourly import DayHourMatrix
+from gorilla import GorillaColumns, COLUMNS as GORILLA_COLUMNS
+from sqlstore import SqlStore, ENGINES as SQL_ENGINES, available, db_path
+from overview import FleetSummary
+from simulate import continuation, synth_enriched, synth_raw, write_csv
+
+FLEET_LIMIT_MS = 500            # promised for the fleet overview, cold and per tick
+
+def timeit(fn, repeat=3):
+    """Best wall time of `repeat` runs, in ms."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e3
+
+def _row(*cells):
+    print("".join(f"{c:>14}" for c in cells))
+
+# ─────────────────────────  Benchmarks
+def bench_load(days=(1, 30, 365)):
+    _row("days", "csv ms", "parquet ms", "power ms", "quality ms", "feather ms", "mmap ms")
+    with tempfile.TemporaryDirectory() as tmp:
+        for d in days:
+            csv = write_csv(Path(tmp) / f"d{d}.csv", d)
+            pq  = convert(csv, fmt="parquet").root
+            ft  = convert(csv, fmt="feather").root
+            mm  = MmapStore(Path(tmp) / f"d{d}.mmap")
+            mm.ingest(TailReader(csv))
+            cold = lambda root, fmt, cols=None: ColumnarStore(root, fmt).load(cols)
+            _row(d,
+                 f"{timeit(lambda: TailReader(csv).read()):.1f}",
+                 f"{timeit(lambda: cold(pq, 'parquet')):.1f}",
+                 f"{timeit(lambda: cold(pq, 'parquet', TAB_COLUMNS['tab-power'])):.1f}",
+                 f"{timeit(lambda: cold(pq, 'parquet', TAB_COLUMNS['tab-quality'])):.1f}",
+                 f"{timeit(lambda: cold(ft, 'feather', TAB_COLUMNS['tab-power'])):.1f}",
+                 f"{timeit(lambda: MmapStore(mm.root).load()):.1f}")
+
+def bench_dtypes(days=(1, 30, 365)):
+    _row("days", "default MB", "compact MB", "ratio")
+    for d in days:
+        df = finish_frame(synth_enriched(d * 1440))
+        before, after = footprint(df), footprint(apply_schema(df, SCHEMA))
+        _row(d, f"{before/2**20:.1f}", f"{after/2**20:.1f}", f"{before/after:.2f}x")
+
+def bench_enrich(sizes=(100_000, 1_000_000, 10_000_000), chunk=1440):
+    _row("rows", "full ms", "Mrows/s", "per-day ms", "per-row ms")
+    for n in sizes:
+        raw  = synth_raw(n)
+        full = timeit(lambda raw=raw: enrich(raw), repeat=1 if n >= 10**6 else 3)
+        warm = Enricher.resume(enrich(raw.iloc[:chunk]))        # a day in, as in a live feed
+        nxt  = raw.iloc[chunk:2 * chunk]
+        day  = timeit(lambda: copy.deepcopy(warm).push(nxt))
+        row  = timeit(lambda: copy.deepcopy(warm).push(nxt.iloc[:1]))
+        _row(n, f"{full:.0f}", f"{n / full / 1e3:.1f}", f"{day:.2f}", f"{row:.2f}")
+        del raw
+
+def bench_fleet(devices=500, days=30, distinct=8):
+    _row("devices", "cold ms", "idle ms", "10% tick ms", "all tick ms")
+    with tempfile.TemporaryDirectory() as tmp:
+        seeds = [write_csv(Path(tmp) / f"seed{i}.csv", days, seed=i) for i in range(distinct)]
+        # the next minute of each seed, as the meter would append it
+        ticks = [continuation(p, 1).to_csv(index=False, header=False).encode() for p in seeds]
+        root  = Path(tmp) / "fleet"
+        root.mkdir()
+        for d in range(devices):
+            shutil.copyfile(seeds[d % distinct], root / f"fridge-{d:04d}.csv")
+        summary = FleetSummary(Fleet(root))
+        tick = lambda every: [open(root / f"fridge-{d:04d}.csv", "ab").write(ticks[d % distinct])
+                              for d in range(0, devices, every)]
+        cold = timeit(summary.table, repeat=1)
+        idle = timeit(summary.table)
+        tick(10)
+        some = timeit(summary.table, repeat=1)
+        tick(1)
+        full = timeit(summary.table, repeat=1)
+        _row(devices, f"{cold:.0f}", f"{idle:.1f}", f"{some:.1f}", f"{full:.1f}")
+        print(f"{summary.workers} worker(s); a tick appends one row to each touched device")
+    over = [f"{k} {v:.0f} ms" for k, v in
+            {"cold": cold, "10% tick": some, "all tick": full}.items() if v > FLEET_LIMIT_MS]
+    if over:
+        raise SystemExit(f"fleet overview over {FLEET_LIMIT_MS} ms: {', '.join(over)}")
+
+def bench_sql(days=(30, 365), span_days=(1, None)):
+    _row("days", "range", "engine", "energy ms", "mean ms", "hourly ms", "hist ms")
+    with tempfile.TemporaryDirectory() as tmp:
+        for d in days:
+            csv  = write_csv(Path(tmp) / f"d{d}.csv", d)
+            data = TailReader(csv).read()
+            sums, hourly = PrefixSums(), DayHourMatrix()
+            vdev = BinnedCounts("Voltage_Deviation_%", VDEV_EDGES)
+            for ix in (sums, hourly, vdev):
+                ix.sync(data)
+            unix = data["unix"].to_numpy()
+            for span in span_days:
+                i1 = len(data)
+                i0 = 0 if span is None else i1 - span * 1440
+                t0, t1 = int(unix[i0]), int(unix[i1 - 1])
+                _row(d, f"{span or d} d", "memory",
+                     f"{timeit(lambda: range_delta(data, 'Energy_kWh', i0, i1)):.3f}",
+                     f"{timeit(lambda: sums.mean('PowerFactor', i0, i1)):.3f}",
+                     f"{timeit(lambda: hourly.by_hour(data, 'dE_kWh', i0, i1)):.3f}",
+                     f"{timeit(lambda: vdev.counts(i0, i1)):.3f}")
+                for engine in SQL_ENGINES:
+                    if not available(engine):
+                        continue
+                    store = SqlStore(db_path(tmp, engine), csv.stem, engine)
+                    if store.version() == "0:0":
+                        store.rewrite(data)
+                    _row("", "", engine,
+                         f"{timeit(lambda: store.delta('Energy_kWh', t0, t1)):.3f}",
+                         f"{timeit(lambda: store.mean('PowerFactor', t0, t1)):.3f}",
+                         f"{timeit(lambda: store.by_hour('dE_kWh', t0, t1)):.3f}",
+                         f"{timeit(lambda: store.counts('Voltage_Deviation_%', VDEV_EDGES, t0, t1)):.3f}")
+
+def bench_gorilla(days=(30, 365)):
+    _row("days", "dtypes", "raw MB", "gorilla MB", "ratio", "1 d ms", "slice 1 d ms", "all ms")
+    for d in days:
+        for schema in (None, SCHEMA):
+            data = finish_frame(synth_enriched(d * 1440), schema)
+            cols = GORILLA_COLUMNS + ["unix"]
+            raw  = int(data[cols].memory_usage(index=False).sum())
+            g    = GorillaColumns()
+            g.sync(data)
+            unix = data["unix"].to_numpy()
+            t0, t1 = int(unix[-1440]), int(unix[-1])
+            day = lambda: data.iloc[np.searchsorted(unix, t0):np.searchsorted(unix, t1, "right")][cols]
+            _row(d, "compact" if schema else "float64",
+                 f"{raw/2**20:.1f}", f"{g.nbytes/2**20:.2f}", f"{raw/g.nbytes:.1f}x",
+                 f"{timeit(lambda: g.frame(t0, t1)):.2f}", f"{timeit(day):.2f}",
+                 f"{timeit(lambda: g.frame(int(unix[0]), t1), repeat=1):.0f}")
+
+BENCHES = {"load": bench_load, "dtypes": bench_dtypes, "enrich": bench_enrich,
+           "fleet": bench_fleet, "sql": bench_sql, "gorilla": bench_gorilla}
+
+# ─────────────────────────  Main
+if __name__ == "__main__":
+    for name in sys.argv[1:] or BENCHES:
+        print(f"── {name}")
+        BENCHES[name]()
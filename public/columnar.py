@@ -0,0 +1,145 @@
+"""
+Fridge IoT – columnar (Parquet / Feather) store for the enriched dataset
+
+The store is a directory of immutable part files. Conversion writes one part,
+ingestion appends a part per batch of new rows, and reads only touch the
+columns asked for. The dashboard no longer loads per tab: its background
+ingest reads the union of `TAB_COLUMNS` (+ `KPI_COLUMNS`) once, because every
+tab is now served from indexes fed by that one frame. Columns no tab uses are
+still never read. The CSV stays the interchange / export format.
+
+    python columnar.py fridge_enriched.csv            # CSV → fridge_enriched.parquet/
+    python columnar.py fridge_enriched.csv --follow   # … then keep ingesting appended rows
+"""
+
+# ─────────────────────────  Imports
+import sys, time
+import pandas as pd
+from pathlib import Path
+from datastore import TailReader
+from kpis import MEAN_COLUMNS
+from rollups import INPUT_COLS as ROLLUP_COLUMNS
+from cycles import INPUT_COLS as CYCLE_COLUMNS
+from hourly import INPUT_COLS as HOURLY_COLUMNS
+
+# ─────────────────────────  CONFIG
+INDEX_COLUMNS = ["Time", "unix"]        # always loaded – the slider works on these
+MAX_PARTS     = 64                      # compact once ingestion has written this many
+FOLLOW_S      = 5                       # poll period of `--follow`
+
+KPI_COLUMNS   = ["Energy_kWh", "Cost_cum_BDT", "Compressor_ON"] + MEAN_COLUMNS
+TAB_COLUMNS   = {                       # what each tab's indexes read – ingest loads the union
+    "tab-power":   ["Time", "ActivePower_kW", "Energy_kWh"] + ROLLUP_COLUMNS,
+    "tab-quality": ["PowerFactor", "Voltage_Deviation_%"],
+    "tab-cost":    ["Cost_cum_BDT"] + HOURLY_COLUMNS,
+    "tab-cycles":  CYCLE_COLUMNS,
+}
+
+_READERS = {"parquet": pd.read_parquet, "feather": pd.read_feather}
+
+class ColumnarStore:
+    """Directory of `part-NNNNN.<fmt>` files with per-column, per-part read caching."""
+
+    def __init__(self, root, fmt="parquet"):
+        if fmt not in _READERS:
+            raise ValueError(f"unknown columnar format: {fmt!r}")
+        self.root   = Path(root)
+        self.fmt    = fmt
+        self._parts = {}            # part path → frame of the columns loaded so far
+        self._full  = set()         # parts whose every column is loaded
+
+    # -- writing
+    def parts(self):
+        return sorted(self.root.glob(f"part-*.{self.fmt}"))
+
+    def append(self, rows):
+        """Write `rows` as a new immutable part."""
+        if rows.empty:
+            return None
+        self.root.mkdir(parents=True, exist_ok=True)
+        parts = self.parts()
+        seq   = int(parts[-1].stem.split("-")[1]) + 1 if parts else 0
+        path  = self.root / f"part-{seq:05d}.{self.fmt}"
+        tmp   = path.with_suffix(".tmp")
+        rows  = rows.reset_index(drop=True)
+        rows.to_parquet(tmp, index=False) if self.fmt == "parquet" else rows.to_feather(tmp)
+        tmp.replace(path)           # readers never see a half-written part
+        return path
+
+    def rewrite(self, frame):
+        """Replace the whole store with `frame` (conversion / full reload)."""
+        old = self.parts()
+        self.append(frame)
+        for p in old:
+            p.unlink()
+
+    def compact(self):
+        """Merge every part into one – keeps the file count bounded."""
+        if len(self.parts()) > 1:
+            self.rewrite(self.load())
+
+    def ingest(self, reader):
+        """Pull new rows from a `TailReader` into the store."""
+        frame = reader.read()
+        if reader.reloaded:
+            self.rewrite(frame)
+        elif reader.appended:
+            self.append(frame.iloc[-reader.appended:])
+            if len(self.parts()) > MAX_PARTS:
+                self.compact()
+
+    # -- reading
+    def version(self):
+        """Changes whenever a part is added or the store is rewritten / compacted."""
+        parts = self.parts()
+        return f"{len(parts)}:{parts[-1].name}" if parts else "empty"
+
+    def load(self, columns=None):
+        """Concatenate `columns` (plus the time index) across all parts."""
+        parts = self.parts()
+        for gone in set(self._parts) - set(parts):
+            del self._parts[gone]
+            self._full.discard(gone)
+        if not parts:
+            return pd.DataFrame(columns=INDEX_COLUMNS + list(columns or []))
+        frames = [self._read_part(p, columns) for p in parts]
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    def _read_part(self, path, columns):
+        have = self._parts.get(path)
+        if columns is None:
+            if path not in self._full:
+                have = self._parts[path] = _READERS[self.fmt](path)
+                self._full.add(path)
+            return have
+        want = list(dict.fromkeys(INDEX_COLUMNS + list(columns)))
+        missing = [c for c in want if have is None or c not in have]
+        if missing:
+            new  = _READERS[self.fmt](path, columns=missing)
+            have = new if have is None else pd.concat([have, new], axis=1)
+            self._parts[path] = have
+        return have[want]
+
+    def to_csv(self, path):
+        """Export the store back to the interchange CSV."""
+        self.load().drop(columns="unix").to_csv(path, index=False)
+
+def convert(csv_path, out=None, fmt="parquet"):
+    """One-shot CSV → columnar conversion; returns the store."""
+    csv_path = Path(csv_path)
+    store = ColumnarStore(out or csv_path.with_suffix(f".{fmt}"), fmt)
+    store.ingest(TailReader(csv_path))
+    return store
+
+# ─────────────────────────  Main
+if __name__ == "__main__":
+    args   = [a for a in sys.argv[1:] if not a.startswith("--")]
+    src    = Path(args[0]) if args else Path(__file__).with_name("fridge_enriched.csv")
+    fmt    = args[1] if len(args) > 1 else "parquet"
+    reader = TailReader(src)
+    store  = ColumnarStore(src.with_suffix(f".{fmt}"), fmt)
+    store.ingest(reader)
+    print(f"wrote {store.root}")
+    while "--follow" in sys.argv:
+        time.sleep(FOLLOW_S)
+        store.ingest(reader)
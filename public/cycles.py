@@ -0,0 +1,108 @@
+"""
+Fridge IoT – compressor cycle table
+
+One row per compressor cycle: an "on" run plus the "off" run that follows it,
+up to the next start. Rows are appended as cycles start; the last one stays
+open and is updated in place while its samples arrive (like the open bucket of
+a rollup tier). Cycle start times are sorted, so the cycles of any slider range
+are two binary searches away – no groupby over raw rows.
+"""
+
+# ─────────────────────────  Imports
+import numpy as np, pandas as pd
+from incremental import GrowArray, Incremental
+
+# ─────────────────────────  CONFIG
+INPUT_COLS = ["Compressor_ON", "Cycle_ID", "dE_kWh", "Current_A"]
+FIELDS     = ["id", "start", "off", "last", "kWh", "peak_A"]
+
+def _segments(t, on, kwh, amps, prev_on):
+    """
+    Per-cycle partial aggregates of a time-ordered chunk. Returns the row
+    offset each segment begins at, its aggregates, and whether the first
+    segment continues the cycle that was open before the chunk.
+    """
+    starts = on & ~np.r_[prev_on, on[:-1]]
+    pos    = np.flatnonzero(starts)
+    bnd    = pos if len(pos) and pos[0] == 0 else np.r_[0, pos]
+    ends   = np.r_[bnd[1:], len(t)]
+    offs   = np.flatnonzero(~on)
+    off_t  = np.full(len(bnd), np.nan)
+    if len(offs):
+        k   = np.minimum(np.searchsorted(offs, bnd), len(offs) - 1)
+        hit = (offs[k] >= bnd) & (offs[k] < ends)
+        off_t[hit] = t[offs[k[hit]]]
+    agg = {"start": t[bnd], "off": off_t, "last": t[ends - 1],
+           "kWh": np.add.reduceat(np.nan_to_num(kwh), bnd),
+           "peak_A": np.fmax.reduceat(amps, bnd)}
+    return bnd, agg, not starts[0]
+
+class CycleIndex(Incremental):
+    """Cycle table kept in step with the frame; the last cycle is still open."""
+
+    def reset(self):
+        self.cols = {f: GrowArray() for f in FIELDS}
+        self._on  = False           # compressor state of the last row seen
+        self._n   = 0               # fallback numbering when Cycle_ID is missing
+
+    def __len__(self):
+        return len(self.cols["start"])
+
+    def extend(self, rows):
+        t    = rows["unix"].to_numpy(np.float64)
+        on   = rows["Compressor_ON"].to_numpy(np.float64, na_value=0) > 0
+        kwh  = rows["dE_kWh"].to_numpy(np.float64, na_value=np.nan)
+        amps = rows["Current_A"].to_numpy(np.float64, na_value=np.nan)
+        bnd, agg, head = _segments(t, on, kwh, amps, self._on)
+        self._on = bool(on[-1])
+        if head:
+            # rows before the first start finish the open cycle (or precede any cycle)
+            if len(self):
+                last = {f: a.values for f, a in self.cols.items()}
+                if np.isnan(last["off"][-1]):
+                    last["off"][-1] = agg["off"][0]
+                last["last"][-1]   = agg["last"][0]
+                last["kWh"][-1]   += agg["kWh"][0]
+                last["peak_A"][-1] = np.fmax(last["peak_A"][-1], agg["peak_A"][0])
+            bnd, agg = bnd[1:], {f: a[1:] for f, a in agg.items()}
+        if not len(bnd):
+            return
+        ids = (rows["Cycle_ID"].to_numpy(np.float64, na_value=np.nan)[bnd]
+               if "Cycle_ID" in rows else np.full(len(bnd), np.nan))
+        fallback = self._n + np.arange(1, len(bnd) + 1)
+        agg["id"] = np.where(np.isnan(ids), fallback, ids)
+        self._n = int(agg["id"][-1])
+        for f, a in agg.items():
+            self.cols[f].extend(a)
+
+    def mark(self):
+        """The table as it is now, for `table(…, mark=)` after more rows came in."""
+        return len(self), {f: float(a.values[-1]) for f, a in self.cols.items() if len(a)}
+
+    def table(self, t0, t1, mark=None):
+        """
+        Cycles starting in [t0, t1]; durations in minutes, `open` marks the
+        running one. With a `mark()`, the table as it was then (e.g. for the
+        Live-off snapshot): later cycles are left out and the one running at
+        the mark keeps its values from then.
+        """
+        n, last = (len(self), None) if mark is None else mark
+        start = self.cols["start"].values[:n]
+        i0 = int(np.searchsorted(start, t0, side="left"))
+        i1 = int(np.searchsorted(start, t1, side="right"))
+        v  = {f: a.values[i0:i1] for f, a in self.cols.items()}
+        if last and i1 == n and i1 > i0:
+            v = {f: np.r_[a[:-1], last[f]] for f, a in v.items()}
+        end   = np.r_[start[i0 + 1:i1 + 1], np.full(max(i1 + 1 - len(start), 0), np.nan)]
+        open_ = np.isnan(end)
+        end   = np.where(open_, v["last"], end)
+        off   = np.where(np.isnan(v["off"]), end, v["off"])
+        return pd.DataFrame({
+            "Cycle_ID": v["id"].astype(np.int64),
+            "Time":     v["start"].astype(np.int64).astype("datetime64[s]"),
+            "on_min":   (off - v["start"]) / 60,
+            "off_min":  (end - off) / 60,
+            "kWh":      v["kWh"],
+            "peak_A":   v["peak_A"],
+            "open":     open_,
+        })
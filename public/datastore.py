@@ -0,0 +1,365 @@
+"""
+Fridge IoT – data layer (CSV ingestion, cache, background ingest)
+"""
+
+# ─────────────────────────  Imports
+import io, os, threading, time
+import pandas as pd
+from contextlib import contextmanager
+from pathlib import Path
+try:
+    import fcntl
+except ImportError:             # Windows – appends and compaction are then not serialised
+    fcntl = None
+
+EPOCH = pd.Timestamp("1970-01-01")
+
+# ─────────────────────────  Compact dtype schema
+# Measurements fit float32 (~7 significant digits); running totals stay float64
+# because differencing two large float32 totals would lose the per-minute step.
+PF_CLASS = pd.CategoricalDtype(["Poor", "Fair", "Good"])
+SCHEMA = {
+    **dict.fromkeys([
+        "Voltage_V", "Frequency_Hz", "Current_A", "ActivePower_kW", "PowerFactor",
+        "ApparentPower_kVA", "ReactivePower_kVAr", "dE_kWh", "dE_kVArh", "dE_kVAh",
+        "Voltage_Deviation_%", "DutyCycle_%_24H", "Cost_step_BDT", "Freq_Deviation_%",
+    ], "float32"),
+    **dict.fromkeys(["Energy_kWh", "Energy_kVArh", "Energy_kVAh", "Cost_cum_BDT"], "float64"),
+    "Breaker_Switch": "uint8",
+    "Compressor_ON":  "uint8",
+    "Cycle_ID":       "UInt32",     # nullable – no cycle while the compressor is off
+    "PF_Class":       PF_CLASS,
+    "unix":           "int64",
+}
+
+def apply_schema(df, schema=SCHEMA):
+    """Cast the columns `schema` knows about; unknown columns are left alone."""
+    casts = {c: t for c, t in schema.items() if c in df}
+    for flag in ("Breaker_Switch", "Compressor_ON"):
+        if flag in casts:
+            df[flag] = df[flag].fillna(0)
+    return df.astype(casts)
+
+def footprint(df):
+    """Bytes held by `df`, including string payloads."""
+    return int(df.memory_usage(deep=True).sum())
+
+# ─────────────────────────  Helpers
+def finish_frame(df, schema=None):
+    """Normalise a freshly parsed chunk: naive local `Time`, integer `unix`, time-ordered."""
+    if isinstance(df["Time"].dtype, pd.DatetimeTZDtype):
+        df["Time"] = df["Time"].dt.tz_localize(None)
+    df["unix"] = (df["Time"] - EPOCH) // pd.Timedelta("1s")
+    if not df["unix"].is_monotonic_increasing:      # range queries binary-search `unix`
+        df = df.sort_values("unix", kind="stable", ignore_index=True)
+    return apply_schema(df, schema) if schema else df
+
+def _complete_lines(buf):
+    """Cut `buf` after its last newline – a half-written row waits for the next tick."""
+    end = buf.rfind(b"\n") + 1
+    return buf[:end]
+
+def read_tail(path, nbytes):
+    """(header line, whole rows among the last `nbytes`, offset after them) – without reading the rest."""
+    with open(path, "rb") as f:
+        header = f.readline()
+        pos = max(f.seek(0, 2) - nbytes, len(header))
+        f.seek(pos)
+        buf = _complete_lines(f.read())
+    end = pos + len(buf)
+    if pos > len(header):
+        buf = buf[buf.find(b"\n") + 1:]     # first line is probably cut
+    return header, buf, end
+
+@contextmanager
+def append_lock(path):
+    """
+    Advisory lock on CSV partition `path`, held by every writer while it appends
+    and by `retention.compact()` while it swaps the file. It lives in
+    `<path>.lock` because the CSV itself gets a new inode on each swap.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+# ─────────────────────────  Incremental reader
+class TailReader:
+    """
+    Keeps the parsed CSV in memory and, on each `read()`, parses only the bytes
+    appended since the previous call. Falls back to a full reload when the file
+    was truncated, rotated (new inode) or rewritten with a different header.
+    With a `schema`, every chunk is cast to compact dtypes as it is parsed.
+    With `keep=False` nothing is accumulated: `read()` returns only the rows it
+    just parsed (the whole file on a reload), for consumers that write them
+    through to a store of their own.
+    """
+
+    def __init__(self, path, schema=None, keep=True):
+        self.path      = Path(path)
+        self.schema    = schema
+        self.keep      = keep
+        self.footprint = None       # (bytes as parsed, bytes after schema) of last full load
+        self.frame     = None       # everything parsed so far (only with `keep`)
+        self.columns   = None       # CSV columns, set by the last full load
+        self.offset    = 0          # bytes consumed so far
+        self.last_time = None       # newest `Time` ingested
+        self.appended  = 0          # rows added by the last read()
+        self.reloaded  = False      # last read() was a full reload
+        self._ino      = None
+        self._header   = None
+
+    def read(self):
+        st = os.stat(self.path)
+        if self._needs_reload(st):
+            return self._load_full(st)
+        self.appended, self.reloaded = 0, False
+        new = self._load_tail() if st.st_size > self.offset else None
+        if self.keep:
+            return self.frame
+        return self._empty if new is None else new
+
+    def forget(self):
+        """Discard what was parsed; the next `read()` reloads the whole file."""
+        self.frame = self.columns = None
+
+    # -- internals
+    def _needs_reload(self, st):
+        if self.columns is None or st.st_ino != self._ino or st.st_size < self.offset:
+            return True
+        with open(self.path, "rb") as f:
+            return f.readline() != self._header
+
+    def _load_full(self, st):
+        with open(self.path, "rb") as f:
+            buf = _complete_lines(f.read())
+        self._header = buf[:buf.find(b"\n") + 1]
+        df = finish_frame(pd.read_csv(io.BytesIO(buf), parse_dates=["Time"]))
+        if self.schema:
+            before = footprint(df)
+            df = apply_schema(df, self.schema)
+            self.footprint = (before, footprint(df))
+        self.frame   = df if self.keep else None
+        self.columns = df.columns.drop("unix")
+        self._empty  = df.iloc[:0]
+        self.offset, self._ino = len(buf), st.st_ino
+        self.last_time = df["Time"].iloc[-1] if len(df) else None
+        self.appended, self.reloaded = len(df), True
+        return df
+
+    def _load_tail(self):
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            buf = _complete_lines(f.read())
+        if not buf:
+            return None
+        self.offset += len(buf)
+        new = pd.read_csv(io.BytesIO(buf), header=None, parse_dates=["Time"],
+                          names=self.columns)
+        new = finish_frame(new, self.schema)
+        if self.last_time is not None:
+            new = new[new["Time"] > self.last_time]     # drop re-written rows
+        if new.empty:
+            return None
+        if self.keep:
+            self.frame = pd.concat([self.frame, new], ignore_index=True)
+        self.last_time = new["Time"].iloc[-1]
+        self.appended = len(new)
+        return new.reset_index(drop=True)
+
+# ─────────────────────────  Process-wide cache
+class DataCache:
+    """
+    Shares one frame between every callback and browser session. The file is
+    re-read only when its (inode, mtime, size) key changes; `invalidate()`
+    forces the next `get()` to go back to the reader.
+    """
+
+    def __init__(self, reader):
+        self.reader  = reader
+        self.frame   = None
+        self.key     = None
+        self.version = 0            # bumped whenever `frame` changes
+        self.hits    = 0
+        self.misses  = 0
+        self._lock   = threading.Lock()
+
+    def get(self):
+        st  = os.stat(self.reader.path)
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            if key == self.key:
+                self.hits += 1
+                return self.frame
+            self.misses += 1
+            frame = self.reader.read()
+            if frame is not self.frame:
+                self.frame, self.version = frame, self.version + 1
+            self.key = key
+            return self.frame
+
+    def invalidate(self, reload=False):
+        """Drop the cache key; with `reload=True` also discard the parsed frame."""
+        with self._lock:
+            self.key = None
+            if reload:
+                self.reader.forget()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "version": self.version,
+                "rows": 0 if self.frame is None else len(self.frame),
+                "bytes": 0 if self.frame is None else footprint(self.frame),
+                # last full load with a schema: bytes as parsed → after the compact dtypes
+                "parsed_bytes": (self.reader.footprint or (None, None))[0],
+                "schema_bytes": (self.reader.footprint or (None, None))[1]}
+
+# ─────────────────────────  Reader/writer lock
+class RWLock:
+    """Many readers or one writer; a waiting writer holds back new readers. Not re-entrant."""
+
+    def __init__(self):
+        self._cond    = threading.Condition()
+        self._readers = 0
+        self._writer  = False
+        self._waiting = 0           # writers queued
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            self._cond.wait_for(lambda: not self._writer and not self._waiting)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._waiting += 1
+            self._cond.wait_for(lambda: not self._writer and not self._readers)
+            self._waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+# ─────────────────────────  Background ingestion
+class Ingestor:
+    """
+    Worker thread that owns all reads of the data source. Every `period_s` (or
+    at once when `wake()` is called, e.g. by a file watcher) it asks `stamp()`
+    whether the source changed; if so it parses the new rows via
+    `load()`, brings the derived `indexes` up to date and swaps in the new
+    frame under the write lock, then bumps `version` and calls `on_publish`.
+    When the new frame does not continue the old one (rotation, truncation,
+    rewrite) the indexes start over; `reloads` counts those passes and
+    `on_reload(frame)` runs under the same write lock. With `publish`, the
+    indexes see the loaded frame but callbacks see `publish(frame)` – e.g.
+    without columns an index already holds in compressed form.
+    Request handlers only ever read (`frame`, indexes) inside `reading()`.
+    """
+
+    def __init__(self, load, stamp, indexes=(), period_s=1.0, on_publish=None,
+                 on_reload=None, publish=None):
+        self.load       = load
+        self.stamp      = stamp
+        self.indexes    = list(indexes)
+        self.publish    = publish
+        self.period_s   = period_s
+        self.on_publish = on_publish
+        self.on_reload  = on_reload
+        self.lock       = RWLock()
+        self.frame      = None
+        self.version    = 0
+        self.reloads    = 0         # frames that were not a continuation of the previous one
+        self.last_ms    = 0.0       # duration of the last ingest step
+        self.errors     = 0
+        self._stamp     = None
+        self._wake      = threading.Event()
+        self._stop      = threading.Event()
+        self._thread    = None
+        self._pid       = None
+
+    def step(self):
+        """One ingest pass; returns True when a new version was published."""
+        stamp = self.stamp()
+        if stamp == self._stamp and self.frame is not None:
+            return False
+        t0 = time.perf_counter()
+        frame = self.load()                     # slow part – outside the lock
+        with self.lock.write():
+            reload = self.frame is not None and not self._continues(frame)
+            for ix in self.indexes:
+                ix.sync(frame)
+            if self.publish:
+                frame = self.publish(frame)
+            self.frame, self._stamp = frame, stamp
+            if reload:
+                self.reloads += 1
+                if self.on_reload:
+                    self.on_reload(frame)
+            self.version += 1
+        self.last_ms = (time.perf_counter() - t0) * 1e3
+        if self.on_publish:
+            self.on_publish(self.version)
+        return True
+
+    def _continues(self, frame):
+        """Same rule as `Incremental.sync`: True when the indexes keep their state."""
+        old, new = self.frame["unix"].to_numpy(), frame["unix"].to_numpy()
+        if not len(old):
+            return True
+        return (len(new) > 0 and new[0] == old[0]
+                and (len(new) < len(old) or new[len(old) - 1] == old[-1]))
+
+    def reading(self):
+        """Context for a consistent view of `frame` + indexes."""
+        return self.lock.read()
+
+    def start(self):
+        """Start (or, after a fork, restart) the worker thread."""
+        if self._stop.is_set():
+            return self
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, daemon=True, name="ingest")
+            self._thread.start()
+        return self
+
+    def wake(self, *_):
+        """Run the next step now instead of at the end of `period_s`."""
+        self._wake.set()
+
+    def stop(self):
+        """Let the worker thread exit after its current step."""
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()          # a wake during the step triggers another one
+            try:
+                self.step()
+            except (OSError, ValueError, pd.errors.ParserError):
+                self.errors += 1        # keep serving the last good snapshot
+            self._wake.wait(self.period_s)
+
+    def stats(self):
+        return {"version": self.version, "last_ms": round(self.last_ms, 2),
+                "errors": self.errors, "reloads": self.reloads,
+                "rows": 0 if self.frame is None else len(self.frame)}
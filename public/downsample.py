@@ -0,0 +1,72 @@
+"""
+Fridge IoT – vectorised downsampling for the time-series figures
+
+`minmax`  keeps the min and max of every bucket → peaks / dips survive.
+`lttb`    Largest-Triangle-Three-Buckets → keeps the visual shape (steps, ramps).
+
+Both return sorted row positions and always keep the first and last point.
+`lttb` anchors each triangle on the neighbouring buckets' means rather than
+on the previously *selected* point, which drops the sequential dependency of
+classic LTTB so the whole series is scored in one NumPy pass.
+"""
+
+# ─────────────────────────  Imports
+import numpy as np
+
+def _buckets(n, n_buckets):
+    """Equal-width buckets over the interior points 1 … n-2 → (start offsets, bucket id per point)."""
+    inner  = n - 2
+    bid    = (np.arange(inner) * n_buckets) // inner
+    starts = np.flatnonzero(np.r_[True, bid[1:] != bid[:-1]])
+    return starts, bid
+
+def _first_where(mask, bid):
+    """Position of the first True per bucket (buckets without one are skipped)."""
+    pos = np.flatnonzero(mask)
+    _, first = np.unique(bid[pos], return_index=True)
+    return pos[first]
+
+def minmax(y, n_out):
+    """Min/max envelope: two points per bucket, ≈ `n_out` points in total."""
+    y = np.asarray(y, np.float64)
+    n = len(y)
+    if n <= n_out or n_out < 4:
+        return np.arange(n)
+    starts, bid = _buckets(n, (n_out - 2) // 2)
+    v = y[1:-1]
+    lo = np.fmin.reduceat(v, starts)[bid]
+    hi = np.fmax.reduceat(v, starts)[bid]
+    keep = np.r_[_first_where(v == lo, bid), _first_where(v == hi, bid)] + 1
+    return np.unique(np.r_[0, keep, n - 1])
+
+def lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets (mean-anchored, fully vectorised)."""
+    x = np.asarray(x, np.float64)
+    y = np.asarray(y, np.float64)
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    starts, bid = _buckets(n, n_out - 2)
+    xi, yi = x[1:-1], np.nan_to_num(y[1:-1])
+    size = np.diff(np.r_[starts, n - 2])
+    mx = np.add.reduceat(xi, starts) / size
+    my = np.add.reduceat(yi, starts) / size
+    # anchors: previous / next bucket mean, first / last point at the ends
+    ax, ay = np.r_[x[0], mx[:-1]][bid], np.r_[y[0], my[:-1]][bid]
+    cx, cy = np.r_[mx[1:], x[-1]][bid], np.r_[my[1:], y[-1]][bid]
+    area = np.abs((ax - cx) * (yi - ay) - (ax - xi) * (cy - ay))
+    best = np.maximum.reduceat(area, starts)[bid]
+    keep = _first_where(area == best, bid) + 1
+    return np.r_[0, keep, n - 1]
+
+def downsample(frame, x, y, n_out, method="lttb"):
+    """Rows of `frame` kept by `method` for the (`x`, `y`) series."""
+    if len(frame) <= n_out:
+        return frame
+    if method == "minmax":
+        idx = minmax(frame[y].to_numpy(np.float64, na_value=np.nan), n_out)
+    elif method == "lttb":
+        idx = lttb(frame[x].to_numpy(np.float64), frame[y].to_numpy(np.float64, na_value=np.nan), n_out)
+    else:
+        raise ValueError(f"unknown downsampling method: {method!r}")
+    return frame.iloc[idx]
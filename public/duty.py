@@ -0,0 +1,104 @@
+"""
+Fridge IoT – streaming compressor duty cycle over sliding time windows
+
+`RollingDuty` holds only the samples still inside its window in a ring
+buffer together with their running "on" count, so each new sample costs O(1)
+amortised (append at the tail, drop expired ones at the head) instead of a
+fresh O(w) window sum. Bulk loads take a vectorised path that costs
+O(w + chunk) per call, so only chunks that are large next to the window use
+it; live appends of a few rows go sample by sample. `DutyIndex` keeps one
+per window (1 h / 24 h / 7 d) in step with the ingested frame, so the
+"Duty 24h" KPI and the trend chart are lookups.
+"""
+
+# ─────────────────────────  Imports
+import numpy as np
+from incremental import GrowArray, Incremental
+
+# ─────────────────────────  CONFIG
+WINDOWS = {"1h": 3_600, "24h": 86_400, "7d": 604_800}      # window length, s
+BULK_RATIO = 64                 # chunks under 1/64 of the held window use push_one
+
+class RollingDuty:
+    """Share of "on" samples in (t - window_s, t], in %."""
+
+    def __init__(self, window_s, capacity=1024):
+        self.window_s = window_s
+        self._t    = np.empty(capacity)
+        self._on   = np.empty(capacity, np.int8)
+        self._head = 0              # oldest sample
+        self._n    = 0              # samples in the window
+        self.on    = 0              # of which "on"
+
+    @property
+    def value(self):
+        return self.on / self._n * 100 if self._n else float("nan")
+
+    def _window(self):
+        """(t, on) of the samples in the window, oldest first."""
+        idx = (self._head + np.arange(self._n)) % len(self._t)
+        return self._t[idx], self._on[idx]
+
+    def _refill(self, t, on):
+        cap = max(len(self._t), 1 << int(len(t)).bit_length())
+        self._t, self._on = np.empty(cap), np.empty(cap, np.int8)
+        self._t[:len(t)], self._on[:len(t)] = t, on
+        self._head, self._n, self.on = 0, len(t), int(on.sum())
+
+    def push_one(self, t, on):
+        """Add one sample and return the duty at `t`."""
+        t, on = float(t), int(on)
+        cap = len(self._t)
+        while self._n and self._t[self._head] <= t - self.window_s:
+            self.on -= int(self._on[self._head])      # int8 would wrap past 127
+            self._head, self._n = (self._head + 1) % cap, self._n - 1
+        if self._n == cap:
+            self._refill(*self._window())
+            cap = len(self._t)
+        tail = (self._head + self._n) % cap
+        self._t[tail], self._on[tail] = t, on
+        self._n += 1
+        self.on += on
+        return self.value
+
+    def push(self, t, on):
+        """`push_one` over a time-ordered chunk; returns the duty per sample."""
+        t  = np.asarray(t, np.float64)
+        on = np.asarray(on, np.int8)
+        if not len(t):
+            return np.empty(0)
+        if len(t) * BULK_RATIO < self._n:       # small chunk: O(chunk), not O(window)
+            return np.array([self.push_one(*s) for s in zip(t.tolist(), on.tolist())])
+        wt, won = self._window()
+        wt, won = np.concatenate((wt, t)), np.concatenate((won, on))
+        csum  = np.concatenate(([0], np.cumsum(won, dtype=np.int64)))
+        end   = np.arange(len(wt) - len(t), len(wt)) + 1
+        start = np.searchsorted(wt, t - self.window_s, side="right")
+        keep  = start[-1]
+        self._refill(wt[keep:], won[keep:])
+        return (csum[end] - csum[start]) / (end - start) * 100
+
+class DutyIndex(Incremental):
+    """Per-row duty (%) for every window in `windows`, aligned with the frame."""
+
+    def __init__(self, windows=WINDOWS):
+        self.windows = dict(windows)
+        super().__init__()
+
+    def reset(self):
+        self._ops  = {w: RollingDuty(s) for w, s in self.windows.items()}
+        self._duty = {w: GrowArray(np.float32) for w in self.windows}
+
+    def extend(self, rows):
+        t  = rows["unix"].to_numpy(np.float64)
+        on = rows["Compressor_ON"].to_numpy(np.int8, na_value=0)
+        for w, op in self._ops.items():
+            self._duty[w].extend(op.push(t, on))
+
+    def at(self, window, i):
+        """Duty over `window` as of row `i`."""
+        return float(self._duty[window][i])
+
+    def series(self, window, i0, i1):
+        """Duty over `window` for rows [i0, i1) – a view, copy before the next ingest."""
+        return self._duty[window].values[i0:i1]
@@ -0,0 +1,154 @@
+"""
+Fridge IoT – enrichment: raw meter samples → fridge_enriched.csv columns
+
+    python enrich.py raw.csv fridge_enriched.csv            # enrich a whole file
+    python enrich.py raw.csv fridge_enriched.csv --follow   # … then keep enriching appends
+
+One vectorised pass over NumPy arrays, no per-row Python. `Enricher` keeps
+the running state (totals, cycle numbering, the last 24 h of compressor
+flags), so appended raw rows are enriched on their own and line up exactly
+with what a full re-run would produce.
+"""
+
+# ─────────────────────────  Imports
+import sys, time
+import numpy as np, pandas as pd
+from pathlib import Path
+from datastore import PF_CLASS, TailReader, append_lock
+from duty import RollingDuty
+
+# ─────────────────────────  CONFIG
+NOMINAL_V      = 230.0
+NOMINAL_HZ     = 50.0
+TARIFF_BDT     = 7.11        # BDT per kWh
+ON_KW          = 0.05        # compressor considered running above this
+DUTY_WINDOW_S  = 86_400      # DutyCycle_%_24H: share of samples "on" in (t-24h, t]
+PF_BINS        = [0.7, 0.9]  # Poor < 0.7 ≤ Fair < 0.9 ≤ Good
+FOLLOW_S       = 1
+RAW_COLUMNS    = ["Time", "Breaker_Switch", "Voltage_V", "Frequency_Hz",
+                  "Current_A", "ActivePower_kW", "PowerFactor"]
+CUMULATIVE     = ["Energy_kWh", "Energy_kVArh", "Energy_kVAh", "Cost_cum_BDT"]
+
+def _seconds(time):
+    """Sample times as float seconds (UTC for tz-aware input)."""
+    ts = pd.DatetimeIndex(time)
+    if ts.tz is not None:
+        ts = ts.tz_convert(None)
+    return ts.as_unit("ms").asi8 / 1e3
+
+class Enricher:
+    """
+    Stateful enrichment. `push(raw)` returns the enriched rows for `raw` and
+    advances the state; `Enricher.resume(enriched_tail)` picks up where an
+    existing enriched file left off.
+    """
+
+    def __init__(self):
+        self.last_t  = None                     # seconds of the last sample
+        self.totals  = dict.fromkeys(CUMULATIVE, 0.0)
+        self.on      = False                    # compressor state of the last sample
+        self.cycle   = 0                        # id of the current on / off run
+        self.duty    = RollingDuty(DUTY_WINDOW_S)
+
+    @classmethod
+    def resume(cls, tail):
+        """State after the enriched rows `tail` (needs ≥ 24 h of it for exact duty)."""
+        self = cls()
+        if len(tail):
+            last = tail.iloc[-1]
+            t    = _seconds(tail["Time"])
+            self.last_t  = t[-1]
+            self.totals  = {c: float(last[c]) for c in CUMULATIVE}
+            self.on      = bool(last["Compressor_ON"])
+            top          = int(np.nan_to_num(tail["Cycle_ID"].max(), nan=0))
+            self.cycle   = top if self.on else top + 1  # an off run follows the last on run
+            self.duty.push(t, tail["Compressor_ON"].to_numpy(np.int8))
+        return self
+
+    def push(self, raw):
+        """Enrich the next chunk of raw samples (time-ordered, after the previous chunk)."""
+        t    = _seconds(raw["Time"])
+        v    = raw["Voltage_V"].to_numpy(np.float64)
+        i    = raw["Current_A"].to_numpy(np.float64)
+        p    = raw["ActivePower_kW"].to_numpy(np.float64)
+        pf   = raw["PowerFactor"].to_numpy(np.float64)
+        hz   = raw["Frequency_Hz"].to_numpy(np.float64)
+        prev = t[:1] if self.last_t is None else [self.last_t]
+        dt_h = np.diff(t, prepend=prev) / 3600
+
+        s  = v * i / 1000
+        q  = np.sqrt(np.clip(s * s - p * p, 0, None))
+        dE, dQ, dS = p * dt_h, q * dt_h, s * dt_h
+        cost = dE * TARIFF_BDT
+        cum  = {c: self.totals[c] + np.cumsum(x)
+                for c, x in zip(CUMULATIVE, (dE, dQ, dS, cost))}
+
+        # compressor runs: as in the export, every on/off transition starts a new run id
+        # and only "on" rows carry theirs (runs 1, 3, 5, … when the file starts "on")
+        on     = p > ON_KW
+        first  = ~on[:1] if self.last_t is None else [self.on]
+        runs   = self.cycle + np.cumsum(on != np.concatenate((first, on[:-1])))
+        cycle  = np.where(on, runs, np.nan)
+
+        duty   = self.duty.push(t, on)
+
+        codes = np.searchsorted(PF_BINS, pf, side="right")
+        codes[np.isnan(pf)] = -1
+
+        out = pd.DataFrame({
+            **{c: raw[c] for c in RAW_COLUMNS if c in raw},
+            "ApparentPower_kVA":   s,
+            "ReactivePower_kVAr":  q,
+            "dE_kWh":              dE,
+            "dE_kVArh":            dQ,
+            "dE_kVAh":             dS,
+            "Energy_kWh":          cum["Energy_kWh"],
+            "Energy_kVArh":        cum["Energy_kVArh"],
+            "Energy_kVAh":         cum["Energy_kVAh"],
+            "Voltage_Deviation_%": (v - NOMINAL_V) / NOMINAL_V * 100,   # signed, as in the export
+            "PF_Class":            pd.Categorical.from_codes(codes, dtype=PF_CLASS),
+            "Compressor_ON":       on.astype(np.int64),
+            "DutyCycle_%_24H":     duty,
+            "Cost_step_BDT":       cost,
+            "Cost_cum_BDT":        cum["Cost_cum_BDT"],
+            "Freq_Deviation_%":    np.abs(hz - NOMINAL_HZ) / NOMINAL_HZ * 100,
+            "Cycle_ID":            cycle,
+        }, index=raw.index, copy=False)
+
+        if len(t):
+            self.last_t = t[-1]
+            self.totals = {c: float(cum[c][-1]) for c in CUMULATIVE}
+            self.on     = bool(on[-1])
+            self.cycle  = int(runs[-1])
+        return out
+
+def enrich(raw):
+    """Enriched frame for a complete raw recording."""
+    return Enricher().push(raw)
+
+def follow(src, dst, every=FOLLOW_S):
+    """Enrich `src` into `dst`, then append the enrichment of every new raw row."""
+    reader = TailReader(src)
+    while True:
+        data = reader.read()
+        if reader.reloaded:                 # first pass, or the raw file was rotated
+            enricher = Enricher()
+            with append_lock(dst):          # retention.compact() may be swapping `dst`
+                enricher.push(data).to_csv(dst, index=False)
+        elif reader.appended:
+            new = data.iloc[-reader.appended:]
+            with append_lock(dst):
+                enricher.push(new).to_csv(dst, mode="a", header=False, index=False)
+        time.sleep(every)
+
+# ─────────────────────────  Main
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    src  = Path(args[0])
+    dst  = Path(args[1]) if len(args) > 1 else src.with_name("fridge_enriched.csv")
+    if "--follow" in sys.argv:
+        follow(src, dst)
+    else:
+        raw = pd.read_csv(src, parse_dates=["Time"])
+        enrich(raw).to_csv(dst, index=False)
+        print(f"wrote {dst}")
@@ -0,0 +1,79 @@
+"""
+Fridge IoT – memoised, serialised figures shared by every session
+
+Callbacks key their outputs on (name, data version, row range, point budget).
+Identical views – the default full range on the same tab, say – are built
+once per data version and then returned as ready-to-send JSON. The LRU
+evicts by entry count and by serialised size.
+"""
+
+# ─────────────────────────  Imports
+import json, threading
+from collections import OrderedDict
+import plotly.io as pio
+from plotly.basedatatypes import BaseFigure
+
+# ─────────────────────────  CONFIG
+MAX_ENTRIES = 256
+MAX_BYTES   = 64 * 2**20
+
+def _serialise(value):
+    """Plain JSON-ready form of one callback output + its size in bytes."""
+    if isinstance(value, BaseFigure):
+        text = pio.to_json(value, validate=False)
+        return json.loads(text), len(text)
+    return value, len(json.dumps(value, default=str))
+
+class FigureCache:
+    """Thread-safe LRU of callback outputs."""
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes   = max_bytes
+        self.bytes       = 0
+        self.hits        = 0
+        self.misses      = 0
+        self.evictions   = 0
+        self._items      = OrderedDict()        # key → (outputs, size)
+        self._lock       = threading.Lock()
+
+    def get(self, key):
+        """Cached outputs for `key`, or None (counted as a miss)."""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, outputs):
+        """Serialise and store `outputs` (a tuple); returns the serialised tuple."""
+        parts = [_serialise(v) for v in outputs]
+        value = tuple(p[0] for p in parts)
+        size  = sum(p[1] for p in parts)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._items[key] = (value, size)
+            self.bytes += size
+            while len(self._items) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, dropped) = self._items.popitem(last=False)
+                self.bytes -= dropped
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.bytes = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"entries": len(self._items), "bytes": self.bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 3) if total else None}
@@ -0,0 +1,228 @@
+"""
+Fridge IoT – fleet of meters, one partition per device
+
+Each meter's series lives in its own partition under the fleet root: an
+enriched `<device>.csv` and/or a binary store `<device>.<fmt>/`. A `Device`
+bundles everything derived from one partition (reader, store, indexes and
+its ingest thread). It is opened the first time someone looks at it, and the
+least recently viewed device is closed once more than `max_open` are open.
+Memory therefore follows the devices on screen, not the size of the fleet.
+
+With `compress=True` (CSV partitions only) the slow-moving meter readings
+(`gorilla.COLUMNS`) live only in a `GorillaColumns` index: the indexes that
+need them see every new row in full, then the published frame drops them.
+"""
+
+# ─────────────────────────  Imports
+import os, threading
+import pandas as pd
+from collections import OrderedDict
+from pathlib import Path
+from datastore import TailReader, DataCache, Ingestor
+from columnar import ColumnarStore, KPI_COLUMNS, TAB_COLUMNS
+from mmapstore import MmapStore
+from sqlstore import SqlStore, ENGINES as SQL_ENGINES, db_path
+from kpis import PrefixSums
+from rollups import Rollups
+from duty import DutyIndex
+from cycles import CycleIndex
+from histogram import BinnedCounts, VDEV_EDGES
+from hourly import DayHourMatrix
+from retention import History, SUFFIX as HISTORY_SUFFIX
+from gorilla import GorillaColumns
+
+# ─────────────────────────  CONFIG
+MAX_OPEN       = 8              # devices kept in memory at once
+# one load for every tab (the indexes are built from it), so no per-tab projection
+INGEST_COLUMNS = list(dict.fromkeys(KPI_COLUMNS + sum(TAB_COLUMNS.values(), [])))
+
+def open_store(csv_path, fmt):
+    """Binary stores are fed by `python columnar.py|mmapstore.py … --follow`."""
+    if fmt == "csv":
+        return None                 # parse the CSV in-process (TailReader + DataCache)
+    if fmt in SQL_ENGINES:          # one database per fleet, written through by ingest
+        return SqlStore(db_path(csv_path.parent, fmt), csv_path.stem, fmt)
+    if fmt == "mmap":
+        return MmapStore(csv_path.with_suffix(".mmap"))     # shared across workers
+    return ColumnarStore(csv_path.with_suffix(f".{fmt}"), fmt)  # per-tab columns
+
+class Device:
+    """One meter: its source, derived indexes and background ingestion."""
+
+    def __init__(self, name, csv_path, fmt="csv", schema=None, period_s=1.0,
+                 on_publish=None, compress=False):
+        self.name   = name
+        self.path   = Path(csv_path)
+        self.store  = open_store(self.path, fmt)
+        self.sql    = self.store if isinstance(self.store, SqlStore) else None
+        self.raw    = GorillaColumns() if compress and self.store is None else None
+        # SQL and the compressed frame keep the rows themselves; the reader only hands over new ones
+        self.reader = TailReader(self.path, schema,
+                                 keep=self.sql is None and self.raw is None)  # parses only new rows
+        self.cache  = DataCache(self.reader)            # one frame for all sessions
+        # Derived structures – only the ingest thread writes them
+        self.kpi_sums = PrefixSums()        # running sums → O(1) range means
+        self.rollups  = Rollups()           # 15 min / 1 h / 1 day tiers for long ranges
+        self.duty     = DutyIndex()         # streaming 1 h / 24 h / 7 d duty per row
+        self.cycles   = CycleIndex()        # one row per compressor cycle
+        self.vdev     = BinnedCounts("Voltage_Deviation_%", VDEV_EDGES)
+        self.hourly   = DayHourMatrix()     # energy / cost per day × hour of day
+        self.history  = History(self.path)  # buckets folded out of the CSV by retention.compact()
+        indexes = [self.rollups, self.duty, self.cycles]
+        if self.sql is None:                # SQL answers these range queries itself
+            indexes += [self.kpi_sums, self.vdev, self.hourly]
+        if self.raw is not None:            # Voltage_V, … – compressed, decoded by time range
+            indexes.append(self.raw)
+        self.ingest = Ingestor(lambda: self.load(INGEST_COLUMNS), self.source_version,
+                               indexes=indexes,
+                               period_s=period_s,
+                               on_publish=on_publish and (lambda v: on_publish(self)),
+                               on_reload=self._resnapshot,
+                               publish=self._drop_raw if self.raw is not None else None)
+        self.ingest.step()                  # first snapshot synchronously
+        self._resnapshot(self.ingest.frame) # shown while Live is off
+
+    def _resnapshot(self, frame):
+        # the indexes were rebuilt on `frame`; positions in the old snapshot mean nothing now
+        self.snapshot        = frame
+        self.snapshot_cycles = self.cycles.mark()   # cycle table as of the snapshot
+
+    @property
+    def snapshot_tag(self):
+        """Version label of what Live-off views show (changes when the snapshot is replaced)."""
+        return f"snapshot-{self.ingest.reloads}"
+
+    def start(self):
+        self.ingest.start()
+        return self
+
+    @property
+    def watch_path(self):
+        if self.store is None or self.sql is not None:
+            return self.path        # the CSV is what changes; SQL follows it
+        return self.store.root
+
+    def load(self, columns=None):
+        if self.store is not None:
+            return self.store.load(columns)
+        if self.raw is not None:
+            return self._load_new()
+        return self.cache.get()
+
+    def _load_new(self):
+        """Published frame + the rows parsed since, which still carry the compressed columns."""
+        rows = self.reader.read()
+        slim = self.ingest.frame            # only the ingest thread calls load()
+        if self.reader.reloaded or slim is None:
+            return rows
+        return pd.concat([slim, rows], ignore_index=True) if len(rows) else slim
+
+    def _drop_raw(self, frame):
+        return frame.drop(columns=self.raw.columns, errors="ignore")
+
+    def source_version(self):
+        """Changes exactly when the data behind `load()` does."""
+        self.history.refresh()
+        if self.sql is not None:
+            self.sql.ingest(self.reader)    # write new CSV rows through to the database
+        if self.store is not None:
+            return self.store.version()
+        if self.raw is not None:            # read() would consume the rows load() needs
+            st = os.stat(self.path)
+            return st.st_ino, st.st_mtime_ns, st.st_size
+        self.cache.get()
+        return self.cache.version
+
+    def stats(self):
+        out = {**self.cache.stats(), "ingest": self.ingest.stats(),
+               "history_buckets": len(self.history.buckets)}
+        if self.raw is not None:
+            out["gorilla"] = self.raw.stats()
+        return out
+
+class Fleet:
+    """
+    Devices found under `root` (a directory of partitions) or a single CSV
+    file when `root` is one. `get()` opens devices lazily; `version` counts
+    publishes across the whole fleet.
+    """
+
+    def __init__(self, root, fmt="csv", schema=None, period_s=1.0,
+                 max_open=MAX_OPEN, on_publish=None, compress=False, on_open=None):
+        self.root       = Path(root)
+        self.fmt        = fmt
+        self.schema     = schema
+        self.compress   = compress
+        self.period_s   = period_s
+        self.max_open   = max_open
+        self.on_publish = on_publish
+        self.on_open    = on_open           # called with every newly opened `Device`
+        self.version    = 0
+        self._open      = OrderedDict()     # name → Device, least recently viewed first
+        self._lock      = threading.Lock()
+
+    def partitions(self):
+        """Device name → CSV path of every partition currently on disk."""
+        if self.root.is_file():
+            return {self.root.stem: self.root}
+        found = {p.stem: p for p in self.root.glob("*.csv") if not p.name.endswith(HISTORY_SUFFIX)}
+        if self.fmt != "csv":
+            found.update({p.stem: p.with_suffix(".csv")
+                          for p in self.root.glob(f"*.{self.fmt}") if p.is_dir()})
+        return dict(sorted(found.items()))
+
+    def devices(self):
+        return list(self.partitions())
+
+    def get(self, name):
+        """The open `Device` called `name`, opening it (and closing the LRU one) if needed."""
+        with self._lock:
+            dev = self._open.get(name)
+            if dev is not None:
+                self._open.move_to_end(name)
+                return dev
+        path = self.partitions().get(name)
+        if path is None:
+            raise KeyError(f"unknown device: {name!r}")
+        dev = Device(name, path, self.fmt, self.schema, self.period_s,
+                     on_publish=self._publish, compress=self.compress)  # parse outside the lock
+        with self._lock:
+            if name in self._open:              # opened concurrently – keep the first
+                dev.ingest.stop()
+                return self._open[name]
+            self._open[name] = dev
+            while len(self._open) > self.max_open:
+                _, old = self._open.popitem(last=False)
+                old.ingest.stop()
+        if self.on_open:
+            self.on_open(dev)
+        return dev.start()
+
+    def _publish(self, dev):
+        with self._lock:
+            self.version += 1
+            version = self.version
+        if self.on_publish:
+            self.on_publish(version)
+
+    def start(self):
+        """(Re)start the ingest threads of the open devices, e.g. after a fork."""
+        with self._lock:
+            devs = list(self._open.values())
+        for dev in devs:
+            dev.start()
+        return self
+
+    def wake(self, names=()):
+        """Ingest now on the open devices whose files changed (all of them if unsure)."""
+        with self._lock:
+            devs = list(self._open.values())
+        hit = [d for d in devs if d.path.name in names or d.watch_path.name in names]
+        for dev in hit or devs:
+            dev.ingest.wake()
+
+    def stats(self):
+        with self._lock:
+            devs = list(self._open.values())
+        return {"devices": len(self.partitions()), "open": [d.name for d in devs],
+                **{d.name: d.stats() for d in devs}}
@@ -0,0 +1,169 @@
+"""
+Fridge IoT – Gorilla-style compressed columns for the in-memory history
+
+Timestamps are stored as delta-of-deltas (a minute series is a run of zeros),
+floats as the XOR with the previous value (slow-moving readings share sign,
+exponent and the top of the mantissa). Meter readings are mostly short
+decimals, whose binary mantissas look random; a block whose values are all
+exactly k / 10**e XORs the integers k instead, which is still lossless and
+leaves only a few low bits per change. Gorilla packs every value with its own
+bit-level control code, which can only be decoded one value at a time. Here
+each block of `block` rows shares one bit window and one bitmap of unchanged
+values, so a block decodes with a handful of NumPy calls: unpack bits →
+scatter → cumulative XOR / cumsum.
+
+A range read binary-searches the block start times and decodes only the
+blocks it overlaps. The open last block stays uncompressed until it fills.
+`fleet.Device(compress=True)` keeps one per device as `Device.raw` and drops
+these columns from the frame it publishes.
+"""
+
+# ─────────────────────────  Imports
+import numpy as np, pandas as pd
+from incremental import GrowArray, Incremental
+
+# ─────────────────────────  CONFIG
+BLOCK      = 1024               # rows per compressed block
+COLUMNS    = ["Voltage_V", "Frequency_Hz", "Current_A", "PowerFactor"]
+MAX_DIGITS = 6                  # decimal places tried before falling back to raw float bits
+
+def _pack(values, width):
+    """Low `width` bits of each uint64 in `values`, concatenated MSB first."""
+    if width == 0 or not len(values):
+        return np.empty(0, np.uint8)
+    bits = np.unpackbits(values.astype(">u8").view(np.uint8).reshape(-1, 8), axis=1)
+    return np.packbits(bits[:, 64 - width:])
+
+def _unpack(buf, n, width):
+    if width == 0:
+        return np.zeros(n, np.uint64)
+    bits = np.zeros((n, 64), np.uint8)
+    bits[:, 64 - width:] = np.unpackbits(buf, count=n * width).reshape(n, width)
+    return np.packbits(bits, axis=1).view(">u8").ravel().astype(np.uint64)
+
+def encode_times(unix):
+    """(t0, first delta, indices and values of the non-zero delta-of-deltas)."""
+    unix = np.asarray(unix, np.int64)
+    d    = np.diff(unix)
+    dod  = np.diff(d)
+    nz   = np.flatnonzero(dod)
+    return (int(unix[0]), int(d[0]) if len(d) else 0,
+            nz.astype(np.uint16 if len(unix) <= 1 << 16 else np.uint32), dod[nz])
+
+def decode_times(enc, n):
+    t0, d0, idx, val = enc
+    dod = np.zeros(max(n - 2, 0), np.int64)
+    dod[idx] = val
+    d = d0 + np.concatenate(([0], np.cumsum(dod))) if n > 1 else np.empty(0, np.int64)
+    return t0 + np.concatenate(([0], np.cumsum(d)))
+
+def _decimals(v):
+    """Smallest e with every value k / 10**e (rounded to `v.dtype`) for integer k, else -1."""
+    if np.isnan(v).any():
+        return -1
+    w = v.astype(np.float64)        # float32 230.1 is 230.100006… in float64
+    for e in range(MAX_DIGITS + 1):
+        k = np.round(w * 10.0**e)
+        if np.abs(k).max(initial=0) < 2**52 and ((k / 10.0**e).astype(v.dtype) == v).all():
+            return e
+    return -1
+
+def encode_floats(values):
+    """(decimals, first value's bits, shift, width, bitmap of changed values, packed XORs)."""
+    v    = np.asarray(values)
+    v    = v if v.dtype == np.float32 else v.astype(np.float64)
+    e    = _decimals(v)
+    w    = v.astype(np.float64)
+    bits = (w.view(np.uint64) if e < 0
+            else np.round(w * 10.0**e).astype(np.int64).view(np.uint64))
+    xor  = bits[1:] ^ bits[:-1]
+    nz   = xor != 0
+    x    = xor[nz]
+    ored = int(np.bitwise_or.reduce(x)) if len(x) else 0
+    tz   = (ored & -ored).bit_length() - 1 if ored else 0   # trailing zeros shared by all
+    width = ored.bit_length() - tz if ored else 0           # meaningful bits of the block
+    return e, int(bits[0]), tz, width, np.packbits(nz), _pack(x >> np.uint64(tz), width)
+
+def decode_floats(enc, n):
+    """float64 values; cast to the input dtype to get the encoded values back bit for bit."""
+    e, first, tz, width, bitmap, packed = enc
+    nz  = np.unpackbits(bitmap, count=n - 1).astype(bool)
+    xor = np.zeros(n, np.uint64)
+    xor[0] = first
+    xor[1:][nz] = _unpack(packed, int(nz.sum()), width) << np.uint64(tz)
+    bits = np.bitwise_xor.accumulate(xor)
+    return bits.view(np.float64) if e < 0 else bits.view(np.int64) / 10.0**e
+
+def _nbytes(enc):
+    return sum(a.nbytes if isinstance(a, np.ndarray) else 8 for a in enc)
+
+class GorillaColumns(Incremental):
+    """
+    Compressed `unix` + `columns`, appended on ingest, decoded by time range.
+    Columns come back in the dtype they were ingested with (float32 under the
+    compact schema, float64 otherwise).
+    """
+
+    def __init__(self, columns=COLUMNS, block=BLOCK):
+        self.columns = list(columns)
+        self.block   = block
+        super().__init__()
+
+    def reset(self):
+        self._starts = GrowArray(np.int64)      # first unix of every sealed block
+        self._blocks = []                       # (times, {col: floats}) per sealed block
+        self._open   = {c: GrowArray() for c in self.columns}
+        self._open["unix"] = GrowArray(np.int64)
+
+    def extend(self, rows):
+        new = {"unix": rows["unix"].to_numpy(np.int64)}
+        for c in self.columns:
+            dtype = np.float32 if rows[c].dtype == np.float32 else np.float64
+            if self.rows == 0:          # first rows after a reset fix the column dtype
+                self._open[c] = GrowArray(dtype)
+            new[c] = rows[c].to_numpy(dtype, na_value=np.nan)
+        for c, v in new.items():
+            self._open[c].extend(v)
+        while len(self._open["unix"]) >= self.block:
+            self._seal()
+
+    def _seal(self):
+        head = {c: a.values[:self.block] for c, a in self._open.items()}
+        self._starts.append(head["unix"][0])
+        self._blocks.append((encode_times(head["unix"]),
+                             {c: encode_floats(head[c]) for c in self.columns}))
+        rest = {c: a.values[self.block:].copy() for c, a in self._open.items()}
+        for c, a in self._open.items():
+            a.size = 0
+            a.extend(rest[c])
+
+    def frame(self, t0, t1, columns=None):
+        """Rows with t0 ≤ unix ≤ t1, decoded from the overlapping blocks only."""
+        cols = self.columns if columns is None else list(columns)
+        starts = self._starts.values
+        b0 = max(int(np.searchsorted(starts, t0, side="right")) - 1, 0)
+        b1 = int(np.searchsorted(starts, t1, side="right"))
+        parts = [(decode_times(times, self.block),
+                  {c: decode_floats(floats[c], self.block) for c in cols})
+                 for times, floats in self._blocks[b0:b1]]
+        if b1 == len(self._blocks):
+            parts.append((self._open["unix"].values, {c: self._open[c].values for c in cols}))
+        unix = np.concatenate([p[0] for p in parts]) if parts else np.empty(0, np.int64)
+        i0 = int(np.searchsorted(unix, t0, side="left"))
+        i1 = int(np.searchsorted(unix, t1, side="right"))
+        out = {"unix": unix[i0:i1], "Time": unix[i0:i1].astype("datetime64[s]")}
+        for c in cols:
+            dtype  = self._open[c].values.dtype
+            out[c] = (np.concatenate([p[1][c].astype(dtype, copy=False) for p in parts])[i0:i1]
+                      if parts else np.empty(0, dtype))
+        return pd.DataFrame(out)
+
+    @property
+    def nbytes(self):
+        sealed = sum(_nbytes(t) + sum(_nbytes(f) for f in fs.values()) for t, fs in self._blocks)
+        return sealed + self._starts.values.nbytes + sum(a.values.nbytes for a in self._open.values())
+
+    def stats(self):
+        raw = self.rows * (8 + sum(self._open[c].values.itemsize for c in self.columns))
+        return {"rows": self.rows, "bytes": self.nbytes,
+                "ratio": round(raw / self.nbytes, 2) if self.nbytes else None}
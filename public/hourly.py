@@ -0,0 +1,68 @@
+"""
+Fridge IoT – per-day × per-hour energy / cost matrix
+
+Ingest adds each row's `dE_kWh` / `Cost_step_BDT` into cell [day, hour] of a
+dense matrix (local days, as in `unix`). The hour-of-day split of any range
+is the sum of the matrix rows of the days it fully covers, plus an exact
+bincount of the rows of the partial days at either edge.
+"""
+
+# ─────────────────────────  Imports
+import numpy as np
+from incremental import GrowArray, Incremental
+
+# ─────────────────────────  CONFIG
+DAY_S      = 86_400
+INPUT_COLS = ["dE_kWh", "Cost_step_BDT"]
+
+class DayHourMatrix(Incremental):
+    """`sum[col][day, hour]` of each column in `columns`."""
+
+    def __init__(self, columns=INPUT_COLS):
+        self.columns = list(columns)
+        super().__init__()
+
+    def reset(self):
+        self.day0 = None            # day number of matrix row 0
+        self._m   = {c: GrowArray() for c in self.columns}   # flattened (days, 24)
+
+    @property
+    def days(self):
+        return len(self._m[self.columns[0]]) // 24
+
+    def extend(self, rows):
+        unix = rows["unix"].to_numpy(np.int64)
+        if self.day0 is None:
+            self.day0 = int(unix[0] // DAY_S)
+        cell = (unix // DAY_S - self.day0) * 24 + unix % DAY_S // 3600
+        grow = (int(cell[-1]) // 24 + 1 - self.days) * 24
+        base = int(cell[0])
+        for c in self.columns:
+            self._m[c].extend(np.zeros(max(grow, 0)))
+            w = np.nan_to_num(rows[c].to_numpy(np.float64, na_value=np.nan))
+            add = np.bincount(cell - base, weights=w)
+            self._m[c].values[base:base + len(add)] += add
+
+    def _rows(self, unix, col, data, j0, j1):
+        hours = unix[j0:j1] % DAY_S // 3600
+        w = np.nan_to_num(data[col].to_numpy(np.float64, na_value=np.nan)[j0:j1])
+        return np.bincount(hours, weights=w, minlength=24)
+
+    def by_hour(self, data, col, i0, i1):
+        """Sum of `col` per hour of day over rows [i0, i1) of `data`."""
+        if i1 <= i0:
+            return np.zeros(24)
+        unix = data["unix"].to_numpy()
+        first, last = unix[i0] // DAY_S, unix[i1 - 1] // DAY_S
+        # a day is covered fully when the range reaches past both of its ends
+        lo = first if i0 == 0 or unix[i0 - 1] // DAY_S != first else first + 1
+        whole_last = i1 == self.rows or (i1 < len(unix) and unix[i1] // DAY_S != last)
+        hi = last + 1 if whole_last else last
+        if lo >= hi:
+            return self._rows(unix, col, data, i0, i1)
+        j0 = int(np.searchsorted(unix, lo * DAY_S, side="left"))
+        j1 = int(np.searchsorted(unix, hi * DAY_S, side="left"))
+        m  = self._m[col].values.reshape(-1, 24)
+        return (m[lo - self.day0:hi - self.day0].sum(axis=0)
+                + self._rows(unix, col, data, i0, j0)
+                + self._rows(unix, col, data, j1, i1))
@@ -0,0 +1,76 @@
+"""
+Fridge IoT – building blocks for derived structures kept in step with the data
+"""
+
+# ─────────────────────────  Imports
+import threading
+import numpy as np
+
+# ─────────────────────────  Growable array
+class GrowArray:
+    """1-D NumPy buffer with amortised O(1) append (capacity doubles)."""
+
+    def __init__(self, dtype=np.float64, capacity=1024):
+        self._buf = np.empty(capacity, dtype)
+        self.size = 0
+
+    def extend(self, values):
+        values = np.asarray(values, self._buf.dtype)
+        need = self.size + len(values)
+        if need > len(self._buf):
+            grown = np.empty(max(need, 2 * len(self._buf)), self._buf.dtype)
+            grown[:self.size] = self._buf[:self.size]
+            self._buf = grown
+        self._buf[self.size:need] = values
+        self.size = need
+
+    def append(self, value):
+        self.extend([value])
+
+    @property
+    def values(self):
+        """View of the filled part – valid until the next `extend`."""
+        return self._buf[:self.size]
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, i):
+        return self.values[i]
+
+# ─────────────────────────  Incremental index
+class Incremental:
+    """
+    Base for structures derived from the time-ordered frame (prefix sums,
+    rollups, …). `sync(frame)` feeds only the rows not seen yet to `extend()`
+    and calls `reset()` when the frame is no longer a continuation of what was
+    ingested (file rotated or rewritten). A shorter frame with the same start –
+    e.g. the startup snapshot used when Live is off – is a prefix and is served
+    from the existing state.
+    """
+
+    def __init__(self):
+        self.rows   = 0
+        self._first = None          # unix of row 0
+        self._last  = None          # unix of row `rows-1`
+        self._lock  = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        raise NotImplementedError
+
+    def extend(self, rows):
+        raise NotImplementedError
+
+    def sync(self, frame):
+        with self._lock:
+            unix = frame["unix"].to_numpy()
+            n = len(unix)
+            if self.rows and (n == 0 or unix[0] != self._first
+                              or (n >= self.rows and unix[self.rows - 1] != self._last)):
+                self.rows = 0
+                self.reset()
+            if n > self.rows:
+                self.extend(frame.iloc[self.rows:])
+                self._first, self._last, self.rows = unix[0], unix[-1], n
+        return self
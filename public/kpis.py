@@ -0,0 +1,96 @@
+"""
+Fridge IoT – prefix-sum KPI engine
+
+Totals and means over any slider range come from two lookups into running
+sums instead of a fresh `.mean()` over the slice, so KPI time stays flat no
+matter how wide the range is.
+"""
+
+# ─────────────────────────  Imports
+import numpy as np
+from incremental import GrowArray, Incremental
+
+# ─────────────────────────  CONFIG
+MEAN_COLUMNS = ["Voltage_V", "Current_A", "ActivePower_kW", "PowerFactor"]
+
+class PrefixSums(Incremental):
+    """`sum[c][i]` / `count[c][i]` = NaN-skipping sum / count of column c over rows [0, i)."""
+
+    def __init__(self, columns=MEAN_COLUMNS):
+        self.columns = list(columns)
+        super().__init__()
+
+    def reset(self):
+        self._sum = {c: GrowArray(np.float64) for c in self.columns}
+        self._cnt = {c: GrowArray(np.int64) for c in self.columns}
+        for c in self.columns:
+            self._sum[c].append(0.0)
+            self._cnt[c].append(0)
+
+    def extend(self, rows):
+        for c in self.columns:
+            v  = rows[c].to_numpy(np.float64, na_value=np.nan)
+            ok = ~np.isnan(v)
+            self._sum[c].extend(self._sum[c][-1] + np.cumsum(np.where(ok, v, 0.0)))
+            self._cnt[c].extend(self._cnt[c][-1] + np.cumsum(ok))
+
+    def total(self, col, i0, i1):
+        s = self._sum[col]
+        return float(s[i1] - s[i0])
+
+    def count(self, col, i0, i1):
+        n = self._cnt[col]
+        return int(n[i1] - n[i0])
+
+    def mean(self, col, i0, i1):
+        n = self.count(col, i0, i1)
+        return self.total(col, i0, i1) / n if n else float("nan")
+
+def range_delta(data, col, i0, i1):
+    """Increase of a cumulative column (`Energy_kWh`, `Cost_cum_BDT`) over rows [i0, i1)."""
+    if i1 <= i0:
+        return 0.0
+    return float(data[col].iat[i1 - 1]) - float(data[col].iat[i0])
+
+_NO_KPIS = {"energy_kwh": 0.0, "cost_bdt": 0.0, "avg_volt": float("nan"),
+            "mean_pf": float("nan"), "duty_now": float("nan")}
+
+def range_kpis(data, sums, duty, i0, i1):
+    """KPI row values for rows [i0, i1) of `data` (`duty`: a `duty.DutyIndex`)."""
+    if i1 <= i0:
+        return dict(_NO_KPIS)
+    return {
+        "energy_kwh": range_delta(data, "Energy_kWh", i0, i1),
+        "cost_bdt":   range_delta(data, "Cost_cum_BDT", i0, i1),
+        "avg_volt":   sums.mean("Voltage_V", i0, i1),
+        "mean_pf":    sums.mean("PowerFactor", i0, i1),
+        "duty_now":   duty.at("24h", i1 - 1),
+    }
+
+def store_kpis(store, duty, t0, t1, i1):
+    """`range_kpis` pushed down to a `sqlstore.SqlStore` over unix [t0, t1] (last row i1 - 1)."""
+    if t1 < t0:
+        return dict(_NO_KPIS)
+    return {
+        "energy_kwh": store.delta("Energy_kWh", t0, t1),
+        "cost_bdt":   store.delta("Cost_cum_BDT", t0, t1),
+        "avg_volt":   store.mean("Voltage_V", t0, t1),
+        "mean_pf":    store.mean("PowerFactor", t0, t1),
+        "duty_now":   duty.at("24h", i1 - 1),
+    }
+
+def history_delta(hist, data, col, i0, i1):
+    """`range_delta` from the start of the older buckets in `hist` to row i1 - 1."""
+    end = float(data[col].iat[i1 - 1]) if i1 > i0 else hist[f"{col}_end"]
+    return end - hist[f"{col}_start"]
+
+def with_history(k, hist, data, i0, i1):
+    """KPIs of rows [i0, i1) widened by `hist` (`retention.History.kpis()` of the older buckets)."""
+    out = dict(k)
+    for key, col in (("energy_kwh", "Energy_kWh"), ("cost_bdt", "Cost_cum_BDT")):
+        out[key] = history_delta(hist, data, col, i0, i1)
+    for key, col in (("avg_volt", "Voltage_V"), ("mean_pf", "PowerFactor")):
+        mean, n = (k[key], i1 - i0) if i1 > i0 and not np.isnan(k[key]) else (0.0, 0)
+        rows = hist[f"{col}_cnt"] + n       # raw rows weighted as if none were NaN
+        out[key] = (hist[f"{col}_sum"] + mean * n) / rows if rows else float("nan")
+    return out
@@ -0,0 +1,135 @@
+"""
+Fridge IoT – memory-mapped NumPy store for the numeric columns
+
+One raw, append-only file per column (`<col>.f8`) plus a shared `unix.i8`
+timebase. Readers map the files read-only, so every gunicorn worker behind
+`server = app.server` shares the same page-cache pages instead of holding its
+own pandas copy, and opening the store is O(1) regardless of history length.
+
+    python mmapstore.py fridge_enriched.csv            # CSV → fridge_enriched.mmap/
+    python mmapstore.py fridge_enriched.csv --follow   # … then keep appending new rows
+"""
+
+# ─────────────────────────  Imports
+import os, sys, time
+import numpy as np, pandas as pd
+from pathlib import Path
+from datastore import TailReader
+
+# ─────────────────────────  CONFIG
+NUMERIC_COLUMNS = [
+    "Breaker_Switch", "Voltage_V", "Frequency_Hz", "Current_A", "ActivePower_kW",
+    "PowerFactor", "ApparentPower_kVA", "ReactivePower_kVAr", "dE_kWh", "dE_kVArh",
+    "dE_kVAh", "Energy_kWh", "Energy_kVArh", "Energy_kVAh", "Voltage_Deviation_%",
+    "Compressor_ON", "DutyCycle_%_24H", "Cost_step_BDT", "Cost_cum_BDT",
+    "Freq_Deviation_%", "Cycle_ID",
+]
+FOLLOW_S = 5                    # poll period of `--follow`
+
+class MmapStore:
+    """Append-only column files, read through `np.memmap`."""
+
+    def __init__(self, root, columns=NUMERIC_COLUMNS):
+        self.root    = Path(root)
+        self.columns = list(columns)
+        self.rows    = 0
+        self._maps   = {}
+        self._key    = None         # (inode, size) of unix.i8 when last mapped
+
+    def _path(self, col):
+        return self.root / (f"{col}.i8" if col == "unix" else f"{col}.f8")
+
+    @staticmethod
+    def _dtype(col):
+        return np.int64 if col == "unix" else np.float64
+
+    def _files(self):
+        return {c: self._path(c) for c in self.columns + ["unix"]}
+
+    @staticmethod
+    def _raw(frame, col):
+        if col == "unix":
+            return frame[col].to_numpy(np.int64).tobytes()
+        return frame[col].to_numpy(np.float64, na_value=np.nan).tobytes()
+
+    # -- writing (single writer process)
+    def append(self, frame):
+        """Append rows; `unix` goes last so readers never see a partial row."""
+        if frame.empty:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._repair()
+        for c, path in self._files().items():
+            with open(path, "ab") as f:
+                f.write(self._raw(frame, c))
+
+    def rewrite(self, frame):
+        """Replace every column file. New inodes keep existing mappings valid."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        for c, path in self._files().items():
+            tmp = path.with_name(path.name + ".tmp")
+            with open(tmp, "wb") as f:
+                f.write(self._raw(frame, c))
+            tmp.replace(path)
+
+    def ingest(self, reader):
+        """Pull new rows from a `TailReader` into the store."""
+        frame = reader.read()
+        if reader.reloaded:
+            self.rewrite(frame)
+        elif reader.appended:
+            self.append(frame.iloc[-reader.appended:])
+
+    def _repair(self):
+        """Trim a torn append (writer crashed mid-row) back to the last full row."""
+        rows = self._committed_rows()
+        for p in self._files().values():
+            if p.exists() and p.stat().st_size != rows * 8:
+                os.truncate(p, rows * 8)
+
+    def _committed_rows(self):
+        sizes = [p.stat().st_size if p.exists() else 0 for p in self._files().values()]
+        return min(sizes) // 8
+
+    # -- reading
+    def refresh(self):
+        """Re-map when the writer appended or rewrote; a no-op otherwise."""
+        upath = self._path("unix")
+        st  = os.stat(upath) if upath.exists() else None
+        key = (st.st_ino, st.st_size) if st else None
+        if key == self._key:
+            return False
+        self._key  = key
+        self.rows  = self._committed_rows() if st else 0
+        self._maps = {
+            c: (np.memmap(p, dtype=self._dtype(c), mode="r", shape=(self.rows,))
+                if self.rows else np.empty(0, self._dtype(c)))
+            for c, p in self._files().items()
+        }
+        return True
+
+    def version(self):
+        """(inode, size) of the timebase – changes on every append or rewrite."""
+        self.refresh()
+        return "empty" if self._key is None else "{}:{}".format(*self._key)
+
+    def load(self, columns=None):
+        """Zero-copy frame over the mapped columns (plus `Time` / `unix`)."""
+        self.refresh()
+        cols = self.columns if columns is None else [c for c in columns if c in self.columns]
+        unix = self._maps.get("unix", np.empty(0, np.int64))
+        data = {"Time": unix.view("datetime64[s]"), "unix": unix}
+        data.update({c: self._maps[c] for c in cols})
+        return pd.DataFrame(data, copy=False)
+
+# ─────────────────────────  Main
+if __name__ == "__main__":
+    args   = [a for a in sys.argv[1:] if not a.startswith("--")]
+    src    = Path(args[0]) if args else Path(__file__).with_name("fridge_enriched.csv")
+    reader = TailReader(src)
+    store  = MmapStore(src.with_suffix(".mmap"))
+    store.ingest(reader)
+    print(f"wrote {store.root} ({store._committed_rows()} rows)")
+    while "--follow" in sys.argv:
+        time.sleep(FOLLOW_S)
+        store.ingest(reader)
@@ -0,0 +1,184 @@
+"""
+Fridge IoT – fleet overview: one summary row per device
+
+For every partition: energy and cost over the last `window_s`, the mean PF
+over it, the current 24 h duty and when the meter was last seen. A device is
+summarised from the tail of its CSV only (never the whole history), and a
+result is reused until the partition's (inode, mtime, size) changes.
+Appended rows are folded into the cached window in-process. Partitions that
+need a full (re)read are farmed out to a process pool in chunks.
+"""
+
+# ─────────────────────────  Imports
+import io, multiprocessing, os, threading, time
+import numpy as np, pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from datastore import read_tail, _complete_lines
+from fleet import open_store
+from sqlstore import ENGINES as SQL_ENGINES
+
+# ─────────────────────────  CONFIG
+WINDOW_S  = 86_400              # energy / cost / PF over the last 24 h
+TAIL_B    = 1 << 19             # bytes read on a cold start – > 24 h of rows
+WORKERS   = os.cpu_count() or 1
+COLUMNS   = ["Time", "Energy_kWh", "Cost_cum_BDT", "PowerFactor", "DutyCycle_%_24H"]
+_SERIES   = ["t", "kwh", "bdt", "pf"]
+_FIELDS   = ["device", "energy_kwh", "cost_bdt", "mean_pf", "duty_24h", "last_seen"]
+
+def _seconds(text):
+    """ISO time string → epoch seconds (naive times taken as UTC wall clock)."""
+    ts = datetime.fromisoformat(text)
+    return (ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)).timestamp()
+
+def _num(field):
+    return float(field) if field else np.nan
+
+def _trim(state, window_s):
+    """Keep the rows inside the window plus the one just before it (energy baseline)."""
+    t = state["t"]
+    k = max(int(np.searchsorted(t, t[-1] - window_s, side="right")) - 1, 0)
+    for s in _SERIES:
+        state[s] = state[s][k:]
+    return state
+
+def load_partition(path, fmt="csv", window_s=WINDOW_S, nbytes=TAIL_B):
+    """Fresh window state for one partition (runs in a pool worker)."""
+    if fmt != "csv":
+        data = open_store(path, fmt).load(COLUMNS[1:]).tail(1 << 14)
+        state = {"t": data["unix"].to_numpy(np.float64),
+                 "last_seen": str(data["Time"].iat[-1]) if len(data) else None}
+    else:
+        header, buf, end = read_tail(path, nbytes)
+        data = pd.read_csv(io.BytesIO(header + buf), usecols=COLUMNS, dtype={"Time": str})
+        names = header.decode().rstrip("\r\n").split(",")
+        state = {"t": np.array([_seconds(x) for x in data["Time"].tolist()]),
+                 "offset": end, "header": header, "cols": [names.index(c) for c in COLUMNS],
+                 "last_seen": data["Time"].iat[-1] if len(data) else None}
+    for s, c in zip(_SERIES[1:], COLUMNS[1:4]):
+        state[s] = data[c].to_numpy(np.float64, na_value=np.nan)
+    state["duty"] = float(data["DutyCycle_%_24H"].iat[-1]) if len(data) else np.nan
+    return _trim(state, window_s) if len(data) else state
+
+def _load_chunk(args):
+    return [load_partition(*a) for a in args]
+
+def _append(state, path, window_s):
+    """Fold rows appended since `state["offset"]` into the window; False → reload instead."""
+    with open(path, "rb") as f:
+        if f.readline() != state["header"]:
+            return False
+        f.seek(state["offset"])
+        buf = _complete_lines(f.read())
+    if not buf:
+        return True
+    rows = [line.split(",") for line in buf.decode().splitlines() if line]
+    it, ie, ic, ip, id_ = state["cols"]
+    new = {"t":   [_seconds(r[it]) for r in rows],
+           "kwh": [_num(r[ie]) for r in rows], "bdt": [_num(r[ic]) for r in rows],
+           "pf":  [_num(r[ip]) for r in rows]}
+    for s in _SERIES:
+        state[s] = np.concatenate((state[s], new[s]))
+    state["offset"]   += len(buf)
+    state["duty"]      = _num(rows[-1][id_])
+    state["last_seen"] = rows[-1][it]
+    _trim(state, window_s)
+    return True
+
+def _row(name, state, window_s):
+    t = state["t"]
+    if not len(t):
+        return {"device": name, "energy_kwh": np.nan, "cost_bdt": np.nan,
+                "mean_pf": np.nan, "duty_24h": np.nan, "last_seen": None}
+    inside = slice(1, None) if len(t) > 1 and t[0] <= t[-1] - window_s else slice(None)
+    pf = state["pf"][inside]
+    return {"device":     name,
+            "energy_kwh": state["kwh"][-1] - state["kwh"][0],
+            "cost_bdt":   state["bdt"][-1] - state["bdt"][0],
+            "mean_pf":    float(np.nanmean(pf)) if np.isfinite(pf).any() else np.nan,
+            "duty_24h":   state["duty"],
+            "last_seen":  state["last_seen"]}
+
+class FleetSummary:
+    """Summary table of every partition in a `fleet.Fleet`, cached per data version."""
+
+    def __init__(self, fleet, window_s=WINDOW_S, workers=WORKERS):
+        self.fleet    = fleet
+        self.fmt      = "csv" if fleet.fmt in SQL_ENGINES else fleet.fmt  # SQL follows the CSVs
+        self.window_s = window_s
+        self.workers  = workers
+        self.version  = None        # stat keys of every partition at the last `table()`
+        self.generation = 0         # bumped whenever the table changes
+        self.last_ms  = 0.0
+        self.reloads  = 0
+        self._state   = {}          # name → (key, window state, summary row)
+        self._table   = None
+        self._pool    = None
+        self._stores  = {}          # binary partitions: path → store (for `version()`)
+        self._lock    = threading.Lock()    # held by the one refresh in progress
+
+    def _key(self, path):
+        if self.fmt != "csv":
+            if path not in self._stores:
+                self._stores[path] = open_store(path, self.fmt)
+            return self._stores[path].version()
+        st = os.stat(path)
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _load(self, jobs):
+        """Fresh states for `jobs` [(name, path)], in parallel when it pays off."""
+        args = [(path, self.fmt, self.window_s) for _, path in jobs]
+        if self.workers < 2 or len(args) < 2 * self.workers:
+            return [load_partition(*a) for a in args]
+        if self._pool is None:        # not fork: ingest / inotify / Flask threads may hold locks
+            self._pool = ProcessPoolExecutor(self.workers,
+                                             mp_context=multiprocessing.get_context("forkserver"))
+        size   = -(-len(args) // (4 * self.workers))
+        chunks = [args[i:i + size] for i in range(0, len(args), size)]
+        return [s for part in self._pool.map(_load_chunk, chunks) for s in part]
+
+    def table(self):
+        """
+        One row per partition; only changed partitions are touched. While
+        another caller is refreshing (e.g. the cold load of a large fleet),
+        returns the last table – or an empty one – instead of waiting.
+        """
+        if not self._lock.acquire(blocking=False):
+            table = self._table
+            return pd.DataFrame(columns=_FIELDS) if table is None else table
+        try:
+            return self._refresh()
+        finally:
+            self._lock.release()
+
+    def _refresh(self):
+        t0    = time.perf_counter()
+        parts = self.fleet.partitions()
+        keys  = {name: self._key(path) for name, path in parts.items()}
+        if keys == self.version:
+            return self._table
+        reload = []
+        for name, path in parts.items():
+            cached = self._state.get(name)
+            if cached and cached[0] == keys[name]:
+                continue
+            if (cached and self.fmt == "csv" and cached[0][0] == keys[name][0]
+                    and keys[name][2] >= cached[1]["offset"]
+                    and _append(cached[1], path, self.window_s)):
+                self._state[name] = (keys[name], cached[1], _row(name, cached[1], self.window_s))
+            else:
+                reload.append((name, path))
+        for (name, _), state in zip(reload, self._load(reload)):
+            self._state[name] = (keys[name], state, _row(name, state, self.window_s))
+        for gone in set(self._state) - set(parts):
+            del self._state[gone]
+        self.reloads += len(reload)
+        self._table  = pd.DataFrame([self._state[n][2] for n in parts])
+        self.version = keys
+        self.generation += 1
+        self.last_ms = (time.perf_counter() - t0) * 1e3
+        return self._table
+
+    def stats(self):
+        return {"devices": len(self._state), "reloads": self.reloads,
+                "last_ms": round(self.last_ms, 2)}
@@ -0,0 +1,48 @@
+"""
+Fridge IoT – server-push of data-version changes (Server-Sent Events)
+
+Ingestion calls `publish()` whenever it produced a new data version, which
+wakes every subscribed `/_events` stream, so open dashboards refresh only
+when new rows actually arrived instead of polling.
+Each stream holds a request thread: run behind a threaded / gevent worker.
+"""
+
+# ─────────────────────────  Imports
+import threading
+from flask import Response
+
+# ─────────────────────────  CONFIG
+KEEPALIVE_S = 15.0          # comment line so proxies keep the stream open
+
+class VersionBroadcaster:
+    """Latest data version + a condition variable that waiters block on."""
+
+    def __init__(self):
+        self.version = None
+        self._cond   = threading.Condition()
+
+    def publish(self, version):
+        with self._cond:
+            if version != self.version:
+                self.version = version
+                self._cond.notify_all()
+
+    def wait(self, seen, timeout):
+        """Block until the version differs from `seen` (or `timeout`); return it."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version != seen, timeout)
+            return self.version
+
+    def stream(self):
+        """Flask response emitting `data: <version>` on every change."""
+        def events():
+            seen = None
+            while True:
+                v = self.wait(seen, KEEPALIVE_S)
+                if v == seen:
+                    yield ": keepalive\n\n"
+                else:
+                    seen = v
+                    yield f"data: {v}\n\n"
+        return Response(events(), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
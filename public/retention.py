@@ -0,0 +1,205 @@
+"""
+Fridge IoT – retention: raw minutes for `raw_days`, aggregates before that
+
+`compact()` folds the rows of a partition that are older than `raw_days` into
+hourly buckets in `<device>.history.csv`, and hourly buckets older than
+`hourly_days` into daily ones. It then rewrites the CSV in place with only the
+recent rows. While it picks up the rows appended meanwhile and swaps the file
+it holds `datastore.append_lock`, so writers that take the lock lose nothing.
+A bucket keeps its row count, the sums of `dE_kWh` and `Cost_step_BDT`,
+min / max / sum / count of power, voltage and PF, and the `Energy_kWh` /
+`Cost_cum_BDT` counters at its end, so energy and cost totals stay exact at
+bucket boundaries. The rewrite gets a new inode, which the
+`TailReader` of every consumer sees as a reload. Consumers therefore rebuild
+on a file that no longer grows forever.
+
+`History` is the read side: the dashboard puts its buckets in front of the
+raw rows, so the slider spans the whole history.
+
+    python retention.py fridge_enriched.csv            # compact once
+    python retention.py fridge_enriched.csv --follow   # … and again every COMPACT_S
+"""
+
+# ─────────────────────────  Imports
+import io, os, sys, time
+import numpy as np, pandas as pd
+from pathlib import Path
+from datastore import append_lock, finish_frame
+
+# ─────────────────────────  CONFIG
+RAW_DAYS    = 30                # minute rows kept as they are
+HOURLY_DAYS = 365               # hourly buckets kept this long, daily ones before that
+COMPACT_S   = 3_600             # period of `--follow`
+HOUR_S, DAY_S = 3_600, 86_400
+SUFFIX      = ".history.csv"    # <device>.history.csv next to <device>.csv
+MEAN_COLS   = ["ActivePower_kW", "Voltage_V", "PowerFactor"]    # min / max / sum / count
+SUM_COLS    = ["dE_kWh", "Cost_step_BDT"]
+LAST_COLS   = ["Energy_kWh", "Cost_cum_BDT"]                    # counters at bucket end
+FIELDS      = (["unix", "width_s", "n", "on"] + SUM_COLS + LAST_COLS
+               + [f"{c}_{s}" for c in MEAN_COLS for s in ("min", "max", "sum", "cnt")])
+
+def history_path(csv_path):
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.stem + SUFFIX)
+
+def _col(frame, c, fill=np.nan):
+    return frame[c].to_numpy(np.float64, na_value=fill)
+
+def _as_buckets(raw):
+    """Each raw row as a one-row bucket, so minutes and hours fold the same way."""
+    out = {"unix": raw["unix"].to_numpy(np.int64), "width_s": np.full(len(raw), 60),
+           "n": np.ones(len(raw)), "on": _col(raw, "Compressor_ON", 0.0)}
+    out.update({c: np.nan_to_num(_col(raw, c)) for c in SUM_COLS})
+    out.update({c: _col(raw, c) for c in LAST_COLS})
+    for c in MEAN_COLS:
+        v  = _col(raw, c)
+        ok = ~np.isnan(v)
+        out.update({f"{c}_min": v, f"{c}_max": v,
+                    f"{c}_sum": np.where(ok, v, 0.0), f"{c}_cnt": ok.astype(np.float64)})
+    return pd.DataFrame(out)
+
+def _fold(buckets, width):
+    """Merge time-ordered buckets into `width`-aligned ones (vectorised reduceat)."""
+    if buckets.empty:
+        return buckets
+    unix   = buckets["unix"].to_numpy(np.int64)
+    key    = unix // width
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    ends   = np.r_[starts[1:], len(unix)] - 1
+    out = {"unix": key[starts] * width, "width_s": np.full(len(starts), width)}
+    for f in FIELDS[2:]:
+        v = buckets[f].to_numpy(np.float64)
+        if f in LAST_COLS:
+            out[f] = v[ends]
+        elif f.endswith("_min"):
+            out[f] = np.fmin.reduceat(v, starts)
+        elif f.endswith("_max"):
+            out[f] = np.fmax.reduceat(v, starts)
+        else:
+            out[f] = np.add.reduceat(v, starts)
+    return pd.DataFrame(out)
+
+def _read_history(path):
+    if not path.exists():
+        return pd.DataFrame({f: [] for f in FIELDS})
+    return pd.read_csv(path, usecols=FIELDS, dtype={"unix": "int64", "width_s": "int64"})[FIELDS]
+
+def _write_atomic(path, data):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    tmp.replace(path)                   # readers never see a half-written file
+
+def compact(csv_path, raw_days=RAW_DAYS, hourly_days=HOURLY_DAYS):
+    """Fold rows older than `raw_days` into the history file; returns the rows folded."""
+    csv_path = Path(csv_path)
+    with open(csv_path, "rb") as f:
+        buf = f.read()
+    buf   = buf[:buf.rfind(b"\n") + 1]  # a torn last row stays for the next run
+    lines = buf.splitlines(keepends=True)
+    raw   = pd.read_csv(io.BytesIO(buf), parse_dates=["Time"])
+    if raw.empty:
+        return 0
+    raw  = finish_frame(raw.assign(_line=np.arange(len(raw))))
+    unix = raw["unix"].to_numpy(np.int64)
+    cut  = (int(unix[-1]) - raw_days * DAY_S) // HOUR_S * HOUR_S    # whole hours only
+    old  = unix < cut
+    if not old.any():
+        return 0
+    path = history_path(csv_path)
+    hist = pd.concat([_read_history(path), _fold(_as_buckets(raw[old]), HOUR_S)],
+                     ignore_index=True)
+    day_cut = (int(unix[-1]) - hourly_days * DAY_S) // DAY_S * DAY_S
+    aged    = hist["unix"].to_numpy(np.int64) < day_cut
+    if aged.any():
+        hist = pd.concat([_fold(hist[aged], DAY_S), hist[~aged]], ignore_index=True)
+    _write_atomic(path, hist.to_csv(index=False).encode())
+    # history first: after a crash in between, `History` ignores buckets the raw rows still cover
+    keep = np.sort(raw.loc[~old, "_line"].to_numpy()) + 1           # + header line
+    with append_lock(csv_path):         # no append may land on the inode being replaced
+        with open(csv_path, "rb") as f:                             # rows the meter added meanwhile
+            f.seek(len(buf))
+            extra = f.read()
+        _write_atomic(csv_path, lines[0] + b"".join(lines[i] for i in keep) + extra)
+    return int(old.sum())
+
+class History:
+    """The aggregated past of one partition, re-read whenever `compact()` rewrote it."""
+
+    def __init__(self, csv_path):
+        self.path    = history_path(csv_path)
+        self.version = self._key()      # (inode, mtime) of the loaded history file
+        self.buckets = _read_history(self.path)
+
+    def _key(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns
+
+    def refresh(self):
+        key = self._key()
+        if key != self.version:
+            self.buckets = _read_history(self.path)
+            self.version = key
+        return self
+
+    def before(self, t):
+        """Buckets that end at or before unix `t` (the first raw row)."""
+        b = self.buckets
+        if t is None:
+            return b
+        end = b["unix"].to_numpy(np.int64) + b["width_s"].to_numpy(np.int64)
+        return b.iloc[:int(np.searchsorted(end, t, side="right"))]
+
+    def oldest(self, raw_t0=None):
+        """Start of the first bucket in front of the raw rows, or None."""
+        b = self.before(raw_t0)
+        return int(b["unix"].iat[0]) if len(b) else None
+
+    def span(self, t0, t1, raw_t0):
+        """Buckets overlapping [t0, t1] that precede the raw rows (which start at `raw_t0`)."""
+        b    = self.before(raw_t0)
+        unix = b["unix"].to_numpy(np.int64)
+        end  = unix + b["width_s"].to_numpy(np.int64)
+        return b.iloc[int(np.searchsorted(end, t0, side="right")):
+                      int(np.searchsorted(unix, t1, side="right"))]
+
+    def frame(self, t0, t1, raw_t0):
+        """Plot points like `rollups.Tier.frame` (bucket means, min / max, sums, duty)."""
+        b   = self.span(t0, t1, raw_t0)
+        out = {"unix": b["unix"].to_numpy(np.int64)}
+        out["Time"] = out["unix"].astype("datetime64[s]")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for c in MEAN_COLS:
+                out[c]          = _col(b, f"{c}_sum") / _col(b, f"{c}_cnt")
+                out[f"{c}_min"] = _col(b, f"{c}_min")
+                out[f"{c}_max"] = _col(b, f"{c}_max")
+            for c in SUM_COLS + LAST_COLS:
+                out[c] = _col(b, c)
+            out["duty"] = _col(b, "on") / _col(b, "n")
+        return pd.DataFrame(out)
+
+    def kpis(self, t0, t1, raw_t0):
+        """Counter values at both ends and mean sums / counts of the buckets in range."""
+        b = self.span(t0, t1, raw_t0)
+        if b.empty:
+            return None
+        out = {f"{c}_start": float(b[c].iat[0] - b[s].iat[0])
+               for c, s in zip(LAST_COLS, SUM_COLS)}
+        out.update({f"{c}_end": float(b[c].iat[-1]) for c in LAST_COLS})
+        for c in MEAN_COLS:
+            out[f"{c}_sum"] = float(b[f"{c}_sum"].sum())
+            out[f"{c}_cnt"] = float(b[f"{c}_cnt"].sum())
+        return out
+
+# ─────────────────────────  Main
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    src  = Path(args[0]) if args else Path(__file__).with_name("fridge_enriched.csv")
+    while True:
+        print(f"{src}: folded {compact(src)} rows into {history_path(src).name}")
+        if "--follow" not in sys.argv:
+            break
+        time.sleep(COMPACT_S)
@@ -0,0 +1,111 @@
+"""
+Fridge IoT – multi-resolution rollup tiers (15 min → 1 h → 1 day)
+
+Raw rows are the 1-minute tier. Each coarser tier keeps, per bucket, the
+min / max / mean of power and voltage, the sums of `dE_kWh` and
+`Cost_step_BDT`, and the compressor duty fraction. Tiers are extended on
+ingest (only the open last bucket is re-aggregated), and `pick()` chooses the
+coarsest tier that still gives about one point per screen pixel.
+"""
+
+# ─────────────────────────  Imports
+import numpy as np, pandas as pd
+from incremental import GrowArray, Incremental
+
+# ─────────────────────────  CONFIG
+TIERS        = {"15min": 900, "1h": 3_600, "1d": 86_400}     # bucket width, s
+RANGE_COLS   = ["ActivePower_kW", "Voltage_V"]               # min / max / mean
+SUM_COLS     = ["dE_kWh", "Cost_step_BDT"]
+INPUT_COLS   = RANGE_COLS + SUM_COLS + ["Compressor_ON"]
+
+def _fields():
+    f = ["n", "on"] + SUM_COLS
+    for c in RANGE_COLS:
+        f += [f"{c}_min", f"{c}_max", f"{c}_sum", f"{c}_cnt"]
+    return f
+
+def _aggregate(unix, rows, width):
+    """Per-bucket partial aggregates of a time-ordered chunk (vectorised reduceat)."""
+    bucket = unix // width
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    agg = {"t": bucket[starts] * width,
+           "n": np.diff(np.r_[starts, len(unix)]).astype(np.float64)}
+    on = rows["Compressor_ON"].to_numpy(np.float64, na_value=0.0)
+    agg["on"] = np.add.reduceat(on, starts)
+    for c in SUM_COLS:
+        agg[c] = np.add.reduceat(np.nan_to_num(rows[c].to_numpy(np.float64, na_value=np.nan)), starts)
+    for c in RANGE_COLS:
+        v  = rows[c].to_numpy(np.float64, na_value=np.nan)
+        ok = ~np.isnan(v)
+        agg[f"{c}_min"] = np.fmin.reduceat(v, starts)
+        agg[f"{c}_max"] = np.fmax.reduceat(v, starts)
+        agg[f"{c}_sum"] = np.add.reduceat(np.where(ok, v, 0.0), starts)
+        agg[f"{c}_cnt"] = np.add.reduceat(ok.astype(np.float64), starts)
+    return agg
+
+class Tier:
+    """Column arrays of one rollup resolution; bucket `t` is its start (unix s)."""
+
+    def __init__(self, name, width):
+        self.name  = name
+        self.width = width
+        self.cols  = {"t": GrowArray(np.int64), **{f: GrowArray() for f in _fields()}}
+
+    def __len__(self):
+        return len(self.cols["t"])
+
+    def extend(self, unix, rows):
+        agg = _aggregate(unix, rows, self.width)
+        if len(self) and agg["t"][0] == self.cols["t"][-1]:
+            # first chunk bucket continues the open last bucket → merge it in place
+            last = {f: a.values for f, a in self.cols.items()}
+            for f in _fields():
+                if f.endswith("_min"):
+                    last[f][-1] = np.fmin(last[f][-1], agg[f][0])
+                elif f.endswith("_max"):
+                    last[f][-1] = np.fmax(last[f][-1], agg[f][0])
+                else:
+                    last[f][-1] += agg[f][0]
+            agg = {f: a[1:] for f, a in agg.items()}
+        for f, a in agg.items():
+            self.cols[f].extend(a)
+
+    def frame(self, t0, t1):
+        """Buckets overlapping [t0, t1] with finished aggregates."""
+        t  = self.cols["t"].values
+        i0 = int(np.searchsorted(t, t0 - self.width, side="right"))
+        i1 = int(np.searchsorted(t, t1, side="right"))
+        v  = {f: a.values[i0:i1] for f, a in self.cols.items()}
+        out = {"unix": v["t"], "Time": v["t"].astype("datetime64[s]")}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for c in RANGE_COLS:
+                out[c]          = v[f"{c}_sum"] / v[f"{c}_cnt"]
+                out[f"{c}_min"] = v[f"{c}_min"]
+                out[f"{c}_max"] = v[f"{c}_max"]
+            for c in SUM_COLS:
+                out[c] = v[c]
+            out["duty"] = v["on"] / v["n"]
+        return pd.DataFrame(out)
+
+class Rollups(Incremental):
+    """All tiers, kept in step with the raw frame through `sync()`."""
+
+    def __init__(self, tiers=TIERS):
+        self.widths = dict(tiers)
+        super().__init__()
+
+    def reset(self):
+        self.tiers = {name: Tier(name, w) for name, w in self.widths.items()}
+
+    def extend(self, rows):
+        unix = rows["unix"].to_numpy(np.int64)
+        for tier in self.tiers.values():
+            tier.extend(unix, rows)
+
+    def pick(self, t0, t1, points):
+        """Coarsest tier with ≥ `points` buckets in [t0, t1]; None → raw rows."""
+        best = None
+        for name, w in sorted(self.widths.items(), key=lambda kv: kv[1]):
+            if (t1 - t0) / w >= points:
+                best = self.tiers[name]
+        return best
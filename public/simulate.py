@@ -0,0 +1,82 @@
+"""
+Fridge IoT – synthetic meter data for benchmarks & local testing
+
+    python simulate.py fridge_enriched.csv --days 2     # write 2 days of history
+    python simulate.py fridge_enriched.csv --follow     # … then append a row every FOLLOW_S
+"""
+
+# ─────────────────────────  Imports
+import io, sys, time
+import numpy as np, pandas as pd
+from datetime import timedelta, timezone
+from datastore import append_lock, read_tail
+from enrich import Enricher, enrich, NOMINAL_V, NOMINAL_HZ
+
+# ─────────────────────────  CONFIG
+TZ             = timezone(timedelta(hours=6))     # Asia/Dhaka, as in the meter export
+FOLLOW_S       = 2           # seconds between appended rows in `--follow`
+TAIL_BYTES     = 1 << 19     # > 24 h of rows – enough to resume the duty window
+
+# ─────────────────────────  Raw samples
+def synth_raw(rows, start="2025-08-01 00:00", seed=0):
+    """Per-minute Voltage/Current/Power/PF samples with realistic compressor cycling."""
+    rng = np.random.default_rng(seed)
+    # alternating on/off runs of 20-60 / 8-25 minutes
+    n_runs = rows // 20 + 2
+    runs   = np.empty(n_runs, dtype=np.int64)
+    runs[0::2] = rng.integers(20, 60, size=len(runs[0::2]))
+    runs[1::2] = rng.integers(8, 25, size=len(runs[1::2]))
+    on = np.repeat(np.arange(n_runs) % 2 == 0, runs)[:rows]
+
+    volt = NOMINAL_V + 6*np.sin(np.arange(rows) * 2*np.pi / 1440) + rng.normal(0, 1.5, rows)
+    amps = np.where(on, rng.normal(1.35, 0.05, rows), rng.normal(0.15, 0.02, rows)).clip(0.01)
+    pf   = np.where(on, rng.normal(0.59, 0.02, rows), rng.normal(0.85, 0.08, rows)).clip(0.3, 1.0)
+    return pd.DataFrame({
+        "Time":           pd.date_range(start, periods=rows, freq="min", tz=TZ),
+        "Breaker_Switch": 1.0,
+        "Voltage_V":      volt.round(2),
+        "Frequency_Hz":   (NOMINAL_HZ + rng.normal(0, 0.15, rows)).round(2),
+        "Current_A":      amps.round(3),
+        "ActivePower_kW": (volt * amps * pf / 1000).round(4),
+        "PowerFactor":    pf.round(4),
+    })
+
+# ─────────────────────────  Enriched frame
+def synth_enriched(rows, start="2025-08-01 00:00", seed=0):
+    """`synth_raw` plus every derived column of fridge_enriched.csv."""
+    return enrich(synth_raw(rows, start, seed))
+
+def write_csv(path, days, start="2025-08-01 00:00", seed=0):
+    """Write `days` of per-minute enriched data to `path` in the meter-export format."""
+    synth_enriched(days * 1440, start, seed).to_csv(path, index=False)
+    return path
+
+def _tail_rows(path, nbytes=TAIL_BYTES):
+    """Header + the last rows of the CSV, without reading the whole file."""
+    header, rows, _ = read_tail(path, nbytes)
+    return pd.read_csv(io.BytesIO(header + rows), parse_dates=["Time"])
+
+def continuation(path, rows, seed=None):
+    """`rows` synthetic minutes continuing the file's clock, totals, cycles and duty window."""
+    tail  = _tail_rows(path)
+    start = (tail["Time"].iloc[-1] + pd.Timedelta("1min")).tz_localize(None)
+    return Enricher.resume(tail).push(synth_raw(rows, start, seed))
+
+def follow(path, every=FOLLOW_S):
+    """Simulated meter writer: append one row to `path` every `every` seconds."""
+    while True:
+        block = continuation(path, 1440)    # a day at a time
+        for i in range(len(block)):
+            time.sleep(every)
+            with append_lock(path), open(path, "a") as f:
+                block.iloc[i:i+1].to_csv(f, index=False, header=False)
+
+# ─────────────────────────  Main
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    path = args[0] if args else "fridge_enriched.csv"
+    if "--days" in sys.argv:
+        write_csv(path, int(sys.argv[sys.argv.index("--days") + 1]))
+        print(f"wrote {path}")
+    if "--follow" in sys.argv:
+        follow(path)
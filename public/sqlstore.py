@@ -0,0 +1,262 @@
+"""
+Fridge IoT – embedded SQL store (SQLite, or DuckDB when installed)
+
+Every device's rows go into one `readings` table of a single database file
+per fleet, indexed on (device, unix). Range aggregations the dashboard needs
+(energy / cost deltas, means, hour-of-day sums and histogram bins) run as SQL
+over the index instead of over a pandas frame. `load()` still returns a frame
+for the time-series plots, but it fetches only rows newer than the last call.
+
+Unlike the other stores, the dashboard feeds this one itself: a device's
+`TailReader` rows are written through on every ingest (`fleet.Device`).
+That reader keeps no frame of its own (`keep=False`), so the rows live in the
+database and in the one frame `load()` returns. With several dashboard
+processes on one SQLite file each of them writes through; a write keeps only
+the rows newer than the device's `last_unix`, decided inside the write
+transaction, so nothing is stored twice. DuckDB lets only one process open
+the file, so `duckdb` needs a single dashboard worker.
+
+    python sqlstore.py fridge_enriched.csv            # CSV → fleet.sqlite
+    python sqlstore.py fridge_enriched.csv duckdb     # CSV → fleet.duckdb
+"""
+
+# ─────────────────────────  Imports
+import sqlite3, sys, threading
+import numpy as np, pandas as pd
+from pathlib import Path
+from datastore import TailReader
+from mmapstore import NUMERIC_COLUMNS
+try:
+    import duckdb
+except ImportError:             # optional – SQLite ships with Python
+    duckdb = None
+
+# ─────────────────────────  CONFIG
+ENGINES  = ("sqlite", "duckdb")
+DB_STEM  = "fleet"              # <fleet root>/fleet.<engine> holds every device
+_DAY_S   = 86_400
+# the few places where the two dialects differ
+_DIALECT = {
+    "sqlite": {"div": "/",  "bin": "MIN(MAX(CAST(({v} - ?) / ? AS INTEGER), 0), ?)",
+               "begin": "BEGIN IMMEDIATE"},     # take the write lock before reading `devices`
+    "duckdb": {"div": "//", "bin": "LEAST(GREATEST(CAST(FLOOR(({v} - ?) / ?) AS INTEGER), 0), ?)",
+               "begin": "BEGIN TRANSACTION"},
+}
+_CONNECTIONS = {}               # (path, engine) → (connection, lock), shared by devices
+_OPEN_LOCK   = threading.Lock()
+
+def available(engine):
+    return engine == "sqlite" or (engine == "duckdb" and duckdb is not None)
+
+def db_path(root, engine):
+    return Path(root) / f"{DB_STEM}.{engine}"
+
+def _quote(col):
+    return '"' + col.replace('"', '""') + '"'
+
+def _connect(path, engine, columns):
+    """One connection per database file, serialised by a lock (both engines need it)."""
+    key = (str(path), engine)
+    with _OPEN_LOCK:
+        if key in _CONNECTIONS:
+            return _CONNECTIONS[key]
+        if not available(engine):
+            raise RuntimeError(f"{engine} is not installed (pip install {engine})")
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        if engine == "sqlite":
+            con = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        else:
+            try:
+                con = duckdb.connect(str(path))
+            except duckdb.IOException as e:     # the file lock of another process
+                raise RuntimeError(f"{path} is open in another process – DuckDB mode "
+                                   f"needs a single dashboard worker") from e
+        cols = ", ".join(f"{_quote(c)} DOUBLE" for c in columns)
+        con.execute(f"CREATE TABLE IF NOT EXISTS readings "
+                    f"(device VARCHAR NOT NULL, unix BIGINT NOT NULL, {cols})")
+        con.execute("CREATE INDEX IF NOT EXISTS readings_device_unix ON readings (device, unix)")
+        con.execute("CREATE TABLE IF NOT EXISTS devices (device VARCHAR PRIMARY KEY, "
+                    "rewrites BIGINT, nrows BIGINT, last_unix BIGINT)")
+        _CONNECTIONS[key] = (con, threading.Lock())
+        return _CONNECTIONS[key]
+
+class SqlStore:
+    """One device's rows in a shared embedded database."""
+
+    def __init__(self, path, device, engine="sqlite", columns=NUMERIC_COLUMNS):
+        if engine not in ENGINES:
+            raise ValueError(f"unknown SQL engine: {engine!r}")
+        self.root    = Path(path)
+        self.device  = device
+        self.engine  = engine
+        self.columns = list(columns)
+        self._sql    = _DIALECT[engine]
+        self._con, self._lock = _connect(self.root, engine, self.columns)
+        self._loaded = {}           # column tuple → (version, frame) of the last load()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._con.execute(sql, params).fetchall()
+
+    # -- writing
+    def _meta(self):
+        with self._lock:
+            return self._meta_unlocked()
+
+    def _meta_unlocked(self):
+        row = self._con.execute("SELECT rewrites, nrows, last_unix FROM devices WHERE device = ?",
+                                (self.device,)).fetchall()
+        return row[0] if row else (0, 0, None)
+
+    def _insert(self, frame):
+        unix = frame["unix"].to_numpy(np.int64)
+        vals = [frame[c].to_numpy(np.float64, na_value=np.nan) for c in self.columns]
+        names = ", ".join(["device", "unix"] + [_quote(c) for c in self.columns])
+        if self.engine == "duckdb":
+            batch = pd.DataFrame({"device": self.device, "unix": unix,
+                                  **dict(zip(self.columns, vals))})
+            self._con.register("batch", batch)
+            self._con.execute(f"INSERT INTO readings ({names}) SELECT * FROM batch")
+            self._con.unregister("batch")
+        else:                       # NaN is stored as NULL
+            marks = ", ".join("?" * (len(self.columns) + 2))
+            rows  = zip([self.device] * len(unix), unix.tolist(), *(v.tolist() for v in vals))
+            self._con.executemany(f"INSERT INTO readings ({names}) VALUES ({marks})", rows)
+
+    def _write(self, frame, replace):
+        with self._lock:
+            self._con.execute(self._sql["begin"])
+            try:
+                rewrites, nrows, last = self._meta_unlocked()
+                if replace:
+                    self._con.execute("DELETE FROM readings WHERE device = ?", (self.device,))
+                    rewrites, nrows, last = rewrites + 1, 0, None
+                elif last is not None:          # another process may have written them already
+                    frame = frame[frame["unix"].to_numpy(np.int64) > last]
+                if len(frame):
+                    self._insert(frame)
+                    last = int(frame["unix"].iat[-1])
+                self._con.execute("INSERT OR REPLACE INTO devices VALUES (?, ?, ?, ?)",
+                                  (self.device, rewrites, nrows + len(frame), last))
+            except BaseException:
+                self._con.execute("ROLLBACK")
+                raise
+            self._con.execute("COMMIT")
+
+    def append(self, frame):
+        if not frame.empty:
+            self._write(frame, replace=False)
+
+    def rewrite(self, frame):
+        self._write(frame, replace=True)
+
+    def ingest(self, reader):
+        """Pull new rows from a `TailReader` (either mode); a reload the table already holds is a no-op."""
+        frame = reader.read()
+        if reader.reloaded:
+            _, nrows, last = self._meta()
+            unix = frame["unix"].to_numpy(np.int64)
+            if 0 < nrows <= len(unix) and unix[nrows - 1] == last:
+                self.append(frame.iloc[nrows:])         # restart: only the unseen tail
+            elif len(unix) < nrows and self._unix_at(len(unix) - 1) == unix[-1]:
+                pass                                    # another process is further ahead
+            else:
+                self.rewrite(frame)
+        elif reader.appended:
+            self.append(frame.iloc[-reader.appended:])
+
+    def _unix_at(self, i):
+        row = self._query("SELECT unix FROM readings WHERE device = ? ORDER BY unix "
+                          "LIMIT 1 OFFSET ?", (self.device, max(i, 0)))
+        return row[0][0] if row else None
+
+    # -- reading
+    def version(self):
+        """Changes on every append or rewrite of this device."""
+        rewrites, nrows, _ = self._meta()
+        return f"{rewrites}:{nrows}"
+
+    def load(self, columns=None):
+        """Frame of `columns` (plus `Time` / `unix`); only rows newer than the last load are fetched."""
+        cols = self.columns if columns is None else [c for c in columns if c in self.columns]
+        key  = tuple(cols)
+        version = self.version()
+        old_version, old = self._loaded.get(key, (None, None))
+        if old_version == version:
+            return old
+        fresh = old is None or old_version.split(":")[0] != version.split(":")[0]
+        since = -2**63 if fresh or not len(old) else int(old["unix"].iat[-1])
+        rows  = self._query(f"SELECT unix, {', '.join(map(_quote, cols))} FROM readings "
+                            f"WHERE device = ? AND unix > ? ORDER BY unix", (self.device, since))
+        arr   = np.array(rows, np.float64).reshape(-1, len(cols) + 1)    # NULL → NaN
+        unix  = arr[:, 0].astype(np.int64)
+        new   = pd.DataFrame({"Time": unix.view("datetime64[s]"), "unix": unix,
+                              **{c: arr[:, j + 1] for j, c in enumerate(cols)}})
+        frame = new if fresh else pd.concat([old, new], ignore_index=True)
+        self._loaded[key] = (version, frame)
+        return frame
+
+    # -- aggregations pushed down to SQL; every range is [t0, t1] in `unix` seconds
+    def _where(self, extra=""):
+        return f"WHERE device = ? AND unix BETWEEN ? AND ? {extra}"
+
+    def delta(self, col, t0, t1):
+        """Increase of a cumulative column over the range (first and last row via the index)."""
+        q = f"SELECT {_quote(col)} FROM readings {self._where()} ORDER BY unix {{}} LIMIT 1"
+        first = self._query(q.format("ASC"),  (self.device, t0, t1))
+        last  = self._query(q.format("DESC"), (self.device, t0, t1))
+        if not first or first[0][0] is None or last[0][0] is None:
+            return 0.0
+        return float(last[0][0]) - float(first[0][0])
+
+    def mean(self, col, t0, t1):
+        (value,), = self._query(f"SELECT AVG({_quote(col)}) FROM readings {self._where()}",
+                                (self.device, t0, t1))
+        return float("nan") if value is None else float(value)
+
+    def by_hour(self, col, t0, t1):
+        """Sum of `col` per hour of day (same day boundaries as `hourly.DayHourMatrix`)."""
+        hour = f"(unix % {_DAY_S}) {self._sql['div']} 3600"
+        rows = self._query(f"SELECT {hour} AS h, SUM({_quote(col)}) FROM readings "
+                           f"{self._where()} GROUP BY h", (self.device, t0, t1))
+        out = np.zeros(24)
+        for h, total in rows:
+            out[int(h)] = total or 0.0
+        return out
+
+    def _edges(self, edges):
+        edges = np.asarray(edges, np.float64)
+        width = float(edges[1] - edges[0])
+        if not np.allclose(np.diff(edges), width):
+            raise ValueError("SQL histograms need evenly spaced edges")
+        return float(edges[0]), float(edges[-1]), width, len(edges) - 1
+
+    def counts(self, col, edges, t0, t1):
+        """Per-bin counts over evenly spaced `edges`; values outside them are not counted."""
+        lo, hi, width, nbins = self._edges(edges)
+        v    = _quote(col)
+        b    = self._sql["bin"].format(v=v)      # the clamp only absorbs rounding at `hi`
+        rows = self._query(f"SELECT {b} AS b, COUNT(*) FROM readings "
+                           f"{self._where(f'AND {v} >= ? AND {v} < ?')} GROUP BY b",
+                           (lo, width, nbins - 1, self.device, t0, t1, lo, hi))
+        out = np.zeros(nbins, np.int64)
+        for k, n in rows:
+            out[int(k)] = n
+        return out
+
+    def outside(self, col, edges, t0, t1):
+        """Rows whose `col` falls outside `edges` (NULLs excluded)."""
+        lo, hi, _, _ = self._edges(edges)
+        v = _quote(col)
+        (n,), = self._query(f"SELECT COUNT(*) FROM readings {self._where(f'AND ({v} < ? OR {v} >= ?)')}",
+                            (self.device, t0, t1, lo, hi))
+        return int(n)
+
+# ─────────────────────────  Main
+if __name__ == "__main__":
+    args   = [a for a in sys.argv[1:] if not a.startswith("--")]
+    src    = Path(args[0]) if args else Path(__file__).with_name("fridge_enriched.csv")
+    engine = args[1] if len(args) > 1 else "sqlite"
+    store  = SqlStore(db_path(src.parent, engine), src.stem, engine)
+    store.ingest(TailReader(src, keep=False))
+    print(f"wrote {store.root} ({store.version().split(':')[1]} rows of {store.device})")
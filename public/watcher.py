@@ -0,0 +1,132 @@
+"""
+Fridge IoT – inotify file watcher (Linux only, optional)
+
+Blocks in the kernel until one of the watched files is appended to, closed
+after writing, or moved/created (rotation), then coalesces the burst and calls
+`on_change(names)` once. No polling, no idle CPU. Uses libc through ctypes so
+there is nothing extra to install; `available()` is False elsewhere and the
+caller falls back to stat-polling.
+"""
+
+# ─────────────────────────  Imports
+import ctypes, ctypes.util, os, select, struct, sys, threading, time
+from pathlib import Path
+
+# ─────────────────────────  CONFIG
+COALESCE_S = 0.02           # bursts of writes within this window → one callback
+
+IN_MODIFY      = 0x0002
+IN_CLOSE_WRITE = 0x0008
+IN_MOVED_TO    = 0x0080
+IN_CREATE      = 0x0100
+IN_DELETE      = 0x0200
+IN_CLOEXEC     = 0o2000000
+MASK           = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT         = struct.Struct("iIII")      # wd, mask, cookie, len (name follows)
+
+def _libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    return libc if hasattr(libc, "inotify_init1") else None
+
+_LIBC = _libc()
+
+def available():
+    return _LIBC is not None
+
+class InotifyWatcher:
+    """
+    Watches the parent directory of each file (so rotation / replace-by-rename
+    is seen too) and filters events by file name. A directory in `paths` is
+    watched as a whole – any change inside it counts. `add()` extends the set
+    while the watcher runs.
+    """
+
+    def __init__(self, paths, on_change, coalesce_s=COALESCE_S):
+        self.on_change  = on_change
+        self.coalesce_s = coalesce_s
+        self._dirs      = {}        # dir → wanted names (None = everything)
+        self._wds    = {}           # watch descriptor → dir
+        self._fd     = None         # inotify descriptor of the running thread
+        self._lock   = threading.Lock()
+        self._thread = None
+        self._pid    = None
+        for p in paths:
+            self.add(p)
+
+    def add(self, path):
+        """Watch `path` too (a file, or a directory as a whole), from any thread."""
+        p = Path(path)
+        with self._lock:
+            if p.is_dir():
+                d = p
+                self._dirs[d] = None
+            elif p.parent.is_dir():
+                d = p.parent
+                names = self._dirs.setdefault(d, set())
+                if names is not None:
+                    names.add(p.name)
+            else:
+                return
+            if self._fd is not None and d not in self._wds.values():
+                try:
+                    self._watch(self._fd, d)
+                except OSError:     # e.g. out of watches – the caller's fallback poll still runs
+                    pass
+
+    def _watch(self, fd, d):
+        wd = _LIBC.inotify_add_watch(fd, os.fsencode(d), MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed: {d}")
+        self._wds[wd] = d
+
+    def start(self):
+        """Start (or, after a fork, restart) the watcher thread."""
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, daemon=True, name="inotify")
+            self._thread.start()
+        return self
+
+    def _open(self):
+        fd = _LIBC.inotify_init1(IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        with self._lock:
+            self._wds = {}          # descriptors of a pre-fork thread mean nothing here
+            for d in self._dirs:
+                self._watch(fd, d)
+            self._fd = fd
+        return fd
+
+    def _drain(self, fd):
+        """Names of watched files touched by the queued events."""
+        buf, hit, off = os.read(fd, 64 * 1024), set(), 0
+        while off < len(buf):
+            wd, mask, _, n = _EVENT.unpack_from(buf, off)
+            name = buf[off + _EVENT.size: off + _EVENT.size + n].rstrip(b"\0").decode()
+            off += _EVENT.size + n
+            with self._lock:
+                wanted = self._dirs.get(self._wds.get(wd), set())
+            if wanted is None or name in wanted:
+                hit.add(name)
+        return hit
+
+    def _run(self):
+        fd = self._open()
+        try:
+            while True:
+                select.select([fd], [], [])             # sleep in the kernel
+                names = self._drain(fd)
+                deadline = time.monotonic() + self.coalesce_s
+                while (left := deadline - time.monotonic()) > 0:
+                    if not select.select([fd], [], [], left)[0]:
+                        break
+                    names |= self._drain(fd)
+                if names:
+                    self.on_change(names)
+        finally:
+            with self._lock:
+                self._fd = None
+            os.close(fd)